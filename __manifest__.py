@@ -14,8 +14,12 @@
     'data': [
         'security/hr_leave_security.xml',
         'security/ir.model.access.csv',
+        'data/config_data.xml',
         'data/email_templates.xml',
+        'data/ir_cron_data.xml',
         'views/hr_leave_views.xml',
+        'views/leave_dashboard_templates.xml',
+        'views/res_users_views.xml',
     ],
     'assets': {
         'web.assets_backend': [
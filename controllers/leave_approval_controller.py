@@ -1,9 +1,51 @@
-from odoo import http, fields
+from odoo import http
 from odoo.http import request
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import urlencode
+import base64
+import hashlib
+import json
 import logging
 
+from ..models.hr_leave_approver_inbox import PENDING_DECISION_DOMAIN
+from ..tools.instrumentation import approval_stage, profiling
+
 _logger = logging.getLogger(__name__)
 
+PER_PAGE = 10
+MAX_JSON_LIMIT = 100
+# Most leaves one "all matching" bulk action processes in its transaction
+MAX_BULK_LEAVES = 500
+
+STATUS_FILTERS = [
+    ('all', 'All'),
+    ('to_approve', 'To Approve'),
+    ('second_approval', 'Second Approval'),
+    ('approved', 'Approved'),
+]
+
+# Leave states listed under each status filter
+STATUS_FILTER_STATES = {
+    'all': ('draft', 'confirm', 'validate1', 'validate', 'refuse'),
+    'to_approve': ('confirm',),
+    'second_approval': ('validate1',),
+    'approved': ('validate',),
+}
+
+BULK_ACTION_LABELS = {
+    'approve': 'Approve',
+    'refuse': 'Refuse',
+}
+
+STATUS_LABELS = {
+    'draft': 'Draft',
+    'confirm': 'To Approve',
+    'validate1': 'Second Approval',
+    'validate': 'Approved',
+    'refuse': 'Refused',
+}
+
 class LeaveViewController(http.Controller):
     """Controller for viewing leave requests only - approval functionality removed"""
     
@@ -14,725 +56,310 @@ class LeaveViewController(http.Controller):
             token = kw.get('token')
             approver_id = kw.get('approver_id')
             status_filter = kw.get('status', 'all')
-            department_filter = kw.get('department', 'all')
+            if status_filter not in STATUS_FILTER_STATES:
+                status_filter = 'all'
+            department_filter = self._parse_department_filter(kw.get('department'))
             search_term = (kw.get('search') or '').strip()  # remove extra spaces
 
             if not token or not approver_id:
                 return self._render_error_page("Invalid parameters")
 
-            approver = request.env['res.users'].sudo().browse(int(approver_id))
-            if not approver.exists():
-                return self._render_error_page("Approver not found")
-
-            # Base domain for approver
-            domain = [
-                '|',
-                ('first_approver_id', '=', approver.id),
-                ('second_approver_id', '=', approver.id)
-            ]
-
-            # Status filtering
-            if status_filter == 'to_approve':
-                domain.append(('state', '=', 'confirm'))
-            elif status_filter == 'second_approval':
-                domain.append(('state', '=', 'validate1'))
-            elif status_filter == 'approved':
-                domain.append(('state', '=', 'validate'))
-            else:
-                domain.append(('state', 'in', ['draft', 'confirm', 'validate1', 'validate', 'refuse']))
-
-            # Add search domain only if search_term is not empty
-            if search_term:
-                search_domain = [
-                    '|', '|', '|',
-                    ('employee_id.name', 'ilike', search_term),
-                    ('holiday_status_id.name', 'ilike', search_term),
-                    ('name', 'ilike', search_term),
-                    ('employee_id.department_id.name', 'ilike', search_term)
-                ]
-                domain = domain + search_domain
-
-            # Fetch all leaves matching domain
-            all_leaves = request.env['hr.leave'].sudo().search(domain)
-
-            # Department filter
-            if department_filter != 'all':
-                all_leaves = all_leaves.filtered(
-                    lambda l: l.employee_id.department_id.name == department_filter
+            approver = self._get_link_approver(token, approver_id)
+            if not approver:
+                return self._render_error_page("This link is invalid or has expired")
+
+            with profiling(request.env, 'view_all_requests', uid=approver.id):
+                Leave = request.env['hr.leave'].sudo()
+                # All the approver's leaves matching the search, whatever the status
+                base_domain = self._get_requests_domain(approver, 'all', search_term)
+
+                # Revalidation: nothing is searched nor rendered if the result set
+                # did not change since the client's copy
+                etag = self._get_requests_etag(Leave, base_domain, approver, kw)
+                if request.httprequest.if_none_match.contains_weak(etag):
+                    return request.make_response('', headers=self._get_cache_headers(etag), status=304)
+
+                # Sidebar counts, which also give the size of the filtered list
+                status_counts, departments = self._get_facets(Leave, base_domain, status_filter, department_filter)
+                total_count = status_counts[status_filter]
+
+                domain = self._get_requests_domain(approver, status_filter, search_term)
+                if department_filter != 'all':
+                    domain = domain + [('department_id', '=', department_filter)]
+
+                # Pagination, newest first
+                page = max(int(kw.get('page', 1)), 1)
+                paginated_leaves = Leave.search(
+                    domain,
+                    order='create_date desc, id desc',
+                    offset=(page - 1) * PER_PAGE,
+                    limit=PER_PAGE,
                 )
 
-            # Sort by creation date (newest first)
-            all_leaves = all_leaves.sorted(
-                key=lambda r: r.create_date or fields.Datetime.now(), reverse=True
-            )
-
-            # Unique departments for sidebar
-            departments = list(set([
-                leave.employee_id.department_id.name
-                for leave in all_leaves
-                if leave.employee_id.department_id
-            ]))
-
-            # Pagination
-            page = int(kw.get('page', 1))
-            per_page = 10
-            total_count = len(all_leaves)
-            start_index = (page - 1) * per_page
-            end_index = start_index + per_page
-            paginated_leaves = all_leaves[start_index:end_index]
-
-            total_pages = (total_count + per_page - 1) // per_page
-
-            return self._render_requests_page(
-                paginated_leaves, approver, status_filter, department_filter,
-                search_term, departments, page, total_pages, total_count, kw
-            )
+                total_pages = (total_count + PER_PAGE - 1) // PER_PAGE
+                # rows the approver can decide on get a checkbox
+                pending_ids = set(paginated_leaves and Leave.search(
+                    [('id', 'in', paginated_leaves.ids), self._get_pending_decision_leaf(approver)]).ids)
+
+                response = self._render_requests_page(
+                    paginated_leaves, approver, status_filter, department_filter,
+                    search_term, status_counts, departments, page, total_pages, total_count,
+                    pending_ids, kw
+                )
+                response.headers.extend(self._get_cache_headers(etag))
+                return response
 
         except Exception as e:
             _logger.error(f"View requests error: {e}")
         return self._render_error_page("An error occurred while loading requests")
 
-    
-    def _render_requests_page(self, leaves, approver, status_filter, department_filter, 
-                            search_term, departments, current_page, total_pages, total_count, kw):
-        """Render page showing all requests with Odoo-style interface"""
-        
-        # Build table rows
-        table_rows = ""
-        for leave in leaves:
-            status_display = {
-                'draft': 'Draft',
-                'confirm': 'To Approve',
-                'validate1': 'Second Approval',
-                'validate': 'Approved',
-                'refuse': 'Refused'
-            }.get(leave.state, leave.state.title())
-            
-            status_color = {
-                'draft': '#6c757d',
-                'confirm': '#ffc107',
-                'validate1': '#17a2b8',
-                'validate': '#28a745',
-                'refuse': '#dc3545'
-            }.get(leave.state, '#6c757d')
-            
-            description = leave.name if leave.name else '...'
-            from_date = leave.request_date_from.strftime('%m/%d/%Y') if leave.request_date_from else ''
-            to_date = leave.request_date_to.strftime('%m/%d/%Y') if leave.request_date_to else ''
-            created_date = leave.create_date.strftime('%m/%d/%Y %H:%M:%S') if leave.create_date else ''
-            duration = f"{leave.number_of_days} days" if leave.number_of_days else ""
-            
-            table_rows += f"""
-            <tr>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">
-                    <div style="display: flex; align-items: center;">
-                        <div style="width: 20px; height: 20px; border-radius: 50%; background: #007bff; color: white; display: flex; align-items: center; justify-content: center; font-size: 10px; margin-right: 8px;">
-                            {leave.employee_id.name[:2].upper()}
-                        </div>
-                        {leave.employee_id.name}
-                    </div>
-                </td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{leave.holiday_status_id.name}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef; color: #6c757d;">{description}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{from_date}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{to_date}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{created_date}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{duration}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">
-                    <span style="background: {status_color}; color: white; padding: 4px 8px; border-radius: 4px; font-size: 12px; font-weight: 500;">
-                        {status_display}
-                    </span>
-                </td>
-            </tr>
-            """
-        
-        # Build pagination
-        pagination_html = ""
-        if total_pages > 1:
-            # Previous button
-            prev_disabled = "disabled" if current_page <= 1 else ""
-            prev_link = f"?token={kw.get('token', '')}&approver_id={approver.id}&status={status_filter}&department={department_filter}&search={search_term}&page={current_page-1}" if current_page > 1 else "#"
-            
-            # Next button  
-            next_disabled = "disabled" if current_page >= total_pages else ""
-            next_link = f"?token={kw.get('token', '')}&approver_id={approver.id}&status={status_filter}&department={department_filter}&search={search_term}&page={current_page+1}" if current_page < total_pages else "#"
-            
-            pagination_html = f"""
-            <div style="display: flex; justify-content: space-between; align-items: center; padding: 15px 20px; border-top: 1px solid #e9ecef; background: #f8f9fa;">
-                <span style="color: #6c757d; font-size: 14px;">
-                    {((current_page-1) * 10) + 1}-{min(current_page * 10, total_count)} / {total_count}
-                </span>
-                <div style="display: flex; gap: 5px;">
-                    <a href="{prev_link}" style="padding: 6px 12px; background: {'#e9ecef' if prev_disabled else '#007bff'}; color: {'#6c757d' if prev_disabled else 'white'}; text-decoration: none; border-radius: 4px; font-size: 14px; {'pointer-events: none;' if prev_disabled else ''}">‹</a>
-                    <a href="{next_link}" style="padding: 6px 12px; background: {'#e9ecef' if next_disabled else '#007bff'}; color: {'#6c757d' if next_disabled else 'white'}; text-decoration: none; border-radius: 4px; font-size: 14px; {'pointer-events: none;' if next_disabled else ''}">›</a>
-                </div>
-            </div>
-            """
-        
-        # Build status filters
-        status_filters = f"""
-        <div style="margin-bottom: 20px;">
-            <h6 style="margin: 0 0 10px 0; color: #495057; font-size: 12px; text-transform: uppercase; font-weight: 600;">STATUS</h6>
-            <div style="display: flex; flex-direction: column; gap: 5px;">
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status=all&department={department_filter}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if status_filter == 'all' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if status_filter == 'all' else 'transparent'}; font-size: 14px;">
-                   All
-                </a>
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status=to_approve&department={department_filter}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if status_filter == 'to_approve' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if status_filter == 'to_approve' else 'transparent'}; font-size: 14px;">
-                   To Approve
-                </a>
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status=second_approval&department={department_filter}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if status_filter == 'second_approval' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if status_filter == 'second_approval' else 'transparent'}; font-size: 14px;">
-                   Second Approval
-                </a>
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status=approved&department={department_filter}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if status_filter == 'approved' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if status_filter == 'approved' else 'transparent'}; font-size: 14px;">
-                   Approved
-                </a>
-            </div>
-        </div>
+
+    @http.route('/leave/view_requests/json', type='json', auth='none', methods=['POST'], csrf=False)
+    def view_requests_json(self, token=None, approver_id=None, status='all', department='all',
+                           search=None, cursor=None, limit=PER_PAGE, **kw):
+        """Return the approver's leave requests as compact rows, paged by an opaque cursor.
+
+        Rows are ordered by ``create_date desc, id desc``; ``next_cursor`` encodes
+        the position of the last returned row and is ``None`` on the last page.
         """
-        
-        # Build department filters
-        department_filters = ""
-        if departments:
-            dept_links = f"""
-            <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status={status_filter}&department=all&search={search_term}" 
-               style="padding: 8px 12px; color: {'#007bff' if department_filter == 'all' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if department_filter == 'all' else 'transparent'}; font-size: 14px; display: block;">
-               All
-            </a>
-            """
-            for dept in sorted(departments):
-                dept_links += f"""
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status={status_filter}&department={dept}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if department_filter == dept else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if department_filter == dept else 'transparent'}; font-size: 14px; display: block;">
-                   {dept}
-                </a>
-                """
-            
-            department_filters = f"""
-            <div>
-                <h6 style="margin: 0 0 10px 0; color: #495057; font-size: 12px; text-transform: uppercase; font-weight: 600;">DEPARTMENT</h6>
-                <div style="display: flex; flex-direction: column; gap: 5px;">
-                    {dept_links}
-                </div>
-            </div>
-            """
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>All Time Off</title>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <style>
-                * {{
-                    margin: 0;
-                    padding: 0;
-                    box-sizing: border-box;
-                }}
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial, sans-serif;
-                    background: #f8f9fa;
-                    color: #495057;
-                    font-size: 14px;
-                }}
-                .header {{
-                    background: white;
-                    border-bottom: 1px solid #dee2e6;
-                    padding: 15px 20px;
-                    display: flex;
-                    justify-content: space-between;
-                    align-items: center;
-                }}
-                .header h1 {{
-                    font-size: 18px;
-                    font-weight: 600;
-                    color: #495057;
-                }}
-                .search-box {{
-                    position: relative;
-                }}
-                .search-box input {{
-                    padding: 8px 12px;
-                    border: 1px solid #ced4da;
-                    border-radius: 4px;
-                    font-size: 14px;
-                    width: 300px;
-                }}
-                .search-box button {{
-                    position: absolute;
-                    right: 5px;
-                    top: 50%;
-                    transform: translateY(-50%);
-                    background: none;
-                    border: none;
-                    cursor: pointer;
-                    padding: 5px;
-                }}
-                .main-content {{
-                    display: flex;
-                    min-height: calc(100vh - 60px);
-                }}
-                .sidebar {{
-                    width: 200px;
-                    background: white;
-                    border-right: 1px solid #dee2e6;
-                    padding: 20px;
-                }}
-                .content-area {{
-                    flex: 1;
-                    background: white;
-                    margin: 0;
-                }}
-                .table-container {{
-                    overflow-x: auto;
-                }}
-                table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                    background: white;
-                }}
-                th {{
-                    background: #f8f9fa;
-                    padding: 12px;
-                    text-align: left;
-                    font-weight: 600;
-                    color: #495057;
-                    border-bottom: 2px solid #dee2e6;
-                    font-size: 12px;
-                    text-transform: uppercase;
-                }}
-                .filter-section {{
-                    margin-bottom: 30px;
-                }}
-                .no-results {{
-                    text-align: center;
-                    color: #6c757d;
-                    padding: 60px 20px;
-                    font-size: 16px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>All Time Off</h1>
-                <form class="search-box" method="GET" action="/leave/view_requests">
-                    <input type="hidden" name="token" value="{kw.get('token', '')}">
-                    <input type="hidden" name="approver_id" value="{approver.id}">
-                    <input type="hidden" name="status" value="{status_filter}">
-                    <input type="hidden" name="department" value="{department_filter}">
-                    <input type="text" name="search" value="{search_term}" placeholder="Search...">
-                    <button type="submit">🔍</button>
-                </form>
-            </div>
-            
-            <div class="main-content">
-                <div class="sidebar">
-                    <div class="filter-section">
-                        {status_filters}
-                    </div>
-                    {department_filters}
-                </div>
-                
-                <div class="content-area">
-                    <div class="table-container">
-                        {'<table>' if table_rows else ''}
-                        {'<thead><tr><th>Employee</th><th>Time Off Type</th><th>Description</th><th>From Date</th><th>To Date</th><th>Created Date</th><th>Duration</th><th>Status</th></tr></thead>' if table_rows else ''}
-                        {'<tbody>' + table_rows + '</tbody>' if table_rows else ''}
-                        {'</table>' if table_rows else ''}
-                        
-                        {('<div class="no-results">No time off requests found matching your criteria.</div>') if not table_rows else ''}
-                    </div>
-                    {pagination_html}
-                </div>
-            </div>
-        </body>
-        </html>
+        try:
+            if not token or not approver_id:
+                return {'error': "Invalid parameters"}
+
+            approver = self._get_link_approver(token, approver_id)
+            if not approver:
+                return {'error': "This link is invalid or has expired"}
+
+            with profiling(request.env, 'view_requests_json', uid=approver.id):
+                limit = min(max(int(limit), 1), MAX_JSON_LIMIT)
+                Leave = request.env['hr.leave'].sudo()
+                domain = self._get_requests_domain(approver, status, (search or '').strip())
+                department = self._parse_department_filter(department)
+                if department != 'all':
+                    domain = domain + [('department_id', '=', department)]
+
+                query = Leave._search(domain, order='create_date desc, id desc', limit=limit + 1)
+                if cursor:
+                    create_date, leave_id = self._decode_cursor(cursor)
+                    query.add_where(
+                        f'("{query.table}"."create_date", "{query.table}"."id") < (%s, %s)',
+                        [create_date, leave_id],
+                    )
+                leaves = Leave.browse(query)
+
+                has_more = len(leaves) > limit
+                leaves = leaves[:limit]
+                return {
+                    'rows': [self._leave_to_row(leave) for leave in leaves],
+                    'next_cursor': self._encode_cursor(leaves[-1]) if has_more else None,
+                }
+
+        except Exception as e:
+            _logger.error("View requests JSON error: %s", e)
+        return {'error': "An error occurred while loading requests"}
+
+    @http.route('/leave/view_requests/bulk', type='http', auth='none', methods=['POST'], csrf=False)
+    def bulk_action(self, token=None, approver_id=None, action=None, back_url=None, select_all=None,
+                    status='all', department='all', search=None, **kw):
+        """Approve or refuse the selected leaves as the approver, in one transaction.
+
+        With ``select_all``, the leaves are not the checked rows of the page
+        but every leave waiting for a decision under the posted filters, up
+        to ``MAX_BULK_LEAVES``. Each leave is checked by the regular approval
+        rules; the response reports, per leave, whether it went through or
+        why it did not.
         """
-        return html_content
-    
-    def _render_error_page(self, error_message):
-        """Render error page"""
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Error</title>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <style>
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-                    background: #f8f9fa;
-                    margin: 0;
-                    padding: 20px;
-                    min-height: 100vh;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                }}
-                .container {{
-                    background: white;
-                    border-radius: 12px;
-                    padding: 40px;
-                    text-align: center;
-                    max-width: 400px;
-                    border: 1px solid #dc3545;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-                }}
-                .error-icon {{
-                    font-size: 60px;
-                    color: #dc3545;
-                    margin-bottom: 20px;
-                }}
-                h1 {{
-                    color: #dc3545;
-                    margin-bottom: 15px;
-                    font-size: 24px;
-                }}
-                p {{
-                    margin-bottom: 10px;
-                    line-height: 1.6;
-                }}
-                .help-text {{
-                    color: #6c757d;
-                    font-size: 14px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="error-icon">❌</div>
-                <h1>Error</h1>
-                <p>{error_message}</p>
-                <p class="help-text">Please contact your HR administrator for assistance.</p>
-            </div>
-        </body>
-        </html>
+        try:
+            if not token or not approver_id or action not in BULK_ACTION_LABELS:
+                return self._render_error_page("Invalid parameters")
+
+            approver = self._get_link_approver(token, approver_id)
+            if not approver:
+                return self._render_error_page("This link is invalid or has expired")
+
+            with profiling(request.env, 'bulk_action', uid=approver.id):
+                Leave = request.env['hr.leave'].sudo()
+                remaining_count = 0
+                if select_all:
+                    # resolved with the dashboard's own domain, restricted to the
+                    # leaves waiting for this approver's stage
+                    domain = self._get_requests_domain(approver, status, (search or '').strip())
+                    domain.append(self._get_pending_decision_leaf(approver))
+                    department = self._parse_department_filter(department)
+                    if department != 'all':
+                        domain.append(('department_id', '=', department))
+                    leaves = Leave.search(domain, order='create_date desc, id desc', limit=MAX_BULK_LEAVES + 1)
+                    if len(leaves) > MAX_BULK_LEAVES:
+                        remaining_count = Leave.search_count(domain) - MAX_BULK_LEAVES
+                        leaves = leaves[:MAX_BULK_LEAVES]
+                    leave_ids = leaves.ids
+                else:
+                    leave_ids = [int(leave_id) for leave_id in request.httprequest.form.getlist('leave_ids')]
+                    # Only leaves assigned to the approver, processed with their rights
+                    domain = [('id', 'in', leave_ids)] + self._get_requests_domain(approver, 'all', '')
+                    leaves = Leave.search(domain, order='create_date desc, id desc')
+                if not leave_ids:
+                    return self._render_error_page("No time off request selected")
+
+                results = leaves.with_user(approver)._apply_bulk_action(action)
+                for leave_id in set(leave_ids) - set(leaves.ids):
+                    results[leave_id] = "This time off request is not assigned to you."
+
+                rows = [(leave.id, leave, results[leave.id]) for leave in leaves]
+                rows += [(leave_id, Leave.browse(), results[leave_id]) for leave_id in sorted(set(results) - set(leaves.ids))]
+                return self._render_template('leave_approver.leave_bulk_report_page', {
+                    'action_label': BULK_ACTION_LABELS[action],
+                    'rows': rows,
+                    'success_count': sum(1 for error in results.values() if not error),
+                    'remaining_count': remaining_count,
+                    'status_labels': STATUS_LABELS,
+                    'back_url': back_url if back_url and back_url.startswith('?') else None,
+                })
+
+        except Exception as e:
+            _logger.error("Bulk leave action error: %s", e)
+        return self._render_error_page("An error occurred while processing the requests")
+
+    def _get_link_approver(self, token, approver_id):
+        """Return the approver an emailed link was issued to, or None if it is not valid"""
+        token_record = request.env['hr.leave.approval.token'].sudo()._verify(token)
+        if not token_record:
+            return None
+
+        approver = request.env['res.users'].sudo().browse(int(approver_id)).exists()
+        if token_record.user_id:
+            allowed = token_record.user_id == approver
+        else:
+            leave = token_record.leave_id
+            allowed = approver in leave.first_approver_id | leave.second_approver_ids
+        return approver if approver and allowed else None
+
+    def _parse_department_filter(self, department):
+        """Department id from the ``department`` parameter, or ``'all'``"""
+        try:
+            return int(department)
+        except (TypeError, ValueError):
+            return 'all'
+
+    def _get_facets(self, Leave, base_domain, status_filter, department_filter):
+        """Counts per status filter and per department, from one grouped query.
+
+        Status counts are restricted to the selected department and department
+        counts to the selected status, so each count is what clicking it lists.
+        Departments are returned as ``(id, name, count)`` sorted by name.
         """
-        return html_content
-    
-    def _render_requests_page(self, leaves, approver, status_filter, department_filter, 
-                            search_term, departments, current_page, total_pages, total_count, kw):
+        status_counts = dict.fromkeys(STATUS_FILTER_STATES, 0)
+        department_counts = defaultdict(int)
+        for state, department, count in Leave._read_group(base_domain, ['state', 'department_id'], ['__count']):
+            if department_filter == 'all' or department.id == department_filter:
+                for status, states in STATUS_FILTER_STATES.items():
+                    if state in states:
+                        status_counts[status] += count
+            if department and state in STATUS_FILTER_STATES[status_filter]:
+                department_counts[department] += count
+
+        departments = [(department.id, department.name, count) for department, count in department_counts.items()]
+        return status_counts, sorted(departments, key=lambda department: department[1] or '')
+
+    def _get_requests_etag(self, Leave, domain, approver, params):
+        """Fingerprint of the requests page: one aggregate over the filtered leaves"""
+        [(last_write, count)] = Leave._read_group(domain, aggregates=['write_date:max', '__count'])
+        key = [
+            approver.id, last_write and last_write.isoformat(), count,
+            *(params.get(name) or '' for name in ('status', 'department', 'search', 'page')),
+        ]
+        return hashlib.sha1(json.dumps(key).encode()).hexdigest()
+
+    def _get_cache_headers(self, etag):
+        # private: the page is personal; no-cache: revalidate on every load
+        return [('ETag', '"%s"' % etag), ('Cache-Control', 'private, no-cache')]
+
+    def _get_requests_domain(self, approver, status_filter, search_term):
+        """Domain of the leaves assigned to ``approver`` for the given filters"""
+        # Status filtering
+        states = STATUS_FILTER_STATES.get(status_filter, STATUS_FILTER_STATES['all'])
+
+        # Base domain for approver, resolved on the approver inbox
+        domain = [('approver_inbox_ids', 'any', [('user_id', '=', approver.id), ('state', 'in', list(states))])]
+
+        # Add search domain only if search_term is not empty; one trigram-indexed
+        # column covers employee, time off type, description and department
+        if search_term:
+            domain.append(('approver_search_text', 'ilike', search_term))
+        return domain
+
+    def _get_pending_decision_leaf(self, approver):
+        """Domain leaf of the leaves waiting for a decision of ``approver``
+        at their own stage, as the inbox tracks it"""
+        return ('approver_inbox_ids', 'any', [('user_id', '=', approver.id)] + PENDING_DECISION_DOMAIN)
+
+    def _leave_to_row(self, leave):
+        return {
+            'id': leave.id,
+            'employee': leave.employee_id.name,
+            'department_id': leave.department_id.id or None,
+            'leave_type': leave.holiday_status_id.name,
+            'description': leave.name or '',
+            'date_from': leave.request_date_from and leave.request_date_from.isoformat(),
+            'date_to': leave.request_date_to and leave.request_date_to.isoformat(),
+            'create_date': leave.create_date and leave.create_date.isoformat(),
+            'days': leave.number_of_days,
+            'state': leave.state,
+        }
+
+    def _encode_cursor(self, leave):
+        payload = json.dumps([leave.create_date.isoformat(), leave.id])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _decode_cursor(self, cursor):
+        create_date, leave_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(create_date), int(leave_id)
+
+    def _render_requests_page(self, leaves, approver, status_filter, department_filter,
+                            search_term, status_counts, departments, current_page, total_pages, total_count,
+                            pending_ids, kw):
         """Render page showing all requests with Odoo-style interface"""
-        
-        # Build table rows
-        table_rows = ""
-        for leave in leaves:
-            status_display = {
-                'draft': 'Draft',
-                'confirm': 'To Approve',
-                'validate1': 'Second Approval',
-                'validate': 'Approved',
-                'refuse': 'Refused'
-            }.get(leave.state, leave.state.title())
-            
-            status_color = {
-                'draft': '#6c757d',
-                'confirm': '#ffc107',
-                'validate1': '#17a2b8',
-                'validate': '#28a745',
-                'refuse': '#dc3545'
-            }.get(leave.state, '#6c757d')
-            
-            description = leave.name if leave.name else '...'
-            from_date = leave.request_date_from.strftime('%m/%d/%Y') if leave.request_date_from else ''
-            to_date = leave.request_date_to.strftime('%m/%d/%Y') if leave.request_date_to else ''
-            created_date = leave.create_date.strftime('%m/%d/%Y %H:%M:%S') if leave.create_date else ''
-            duration = f"{leave.number_of_days} days" if leave.number_of_days else ""
-            
-            table_rows += f"""
-            <tr>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">
-                    <div style="display: flex; align-items: center;">
-                        <div style="width: 20px; height: 20px; border-radius: 50%; background: #007bff; color: white; display: flex; align-items: center; justify-content: center; font-size: 10px; margin-right: 8px;">
-                            {leave.employee_id.name[:2].upper()}
-                        </div>
-                        {leave.employee_id.name}
-                    </div>
-                </td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{leave.holiday_status_id.name}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef; color: #6c757d;">{description}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{from_date}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{to_date}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{created_date}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">{duration}</td>
-                <td style="padding: 12px; border-bottom: 1px solid #e9ecef;">
-                    <span style="background: {status_color}; color: white; padding: 4px 8px; border-radius: 4px; font-size: 12px; font-weight: 500;">
-                        {status_display}
-                    </span>
-                </td>
-            </tr>
-            """
-        
-        # Build pagination
-        pagination_html = ""
-        if total_pages > 1:
-            # Previous button
-            prev_disabled = "disabled" if current_page <= 1 else ""
-            prev_link = f"?token={kw.get('token', '')}&approver_id={approver.id}&status={status_filter}&department={department_filter}&search={search_term}&page={current_page-1}" if current_page > 1 else "#"
-            
-            # Next button  
-            next_disabled = "disabled" if current_page >= total_pages else ""
-            next_link = f"?token={kw.get('token', '')}&approver_id={approver.id}&status={status_filter}&department={department_filter}&search={search_term}&page={current_page+1}" if current_page < total_pages else "#"
-            
-            pagination_html = f"""
-            <div style="display: flex; justify-content: space-between; align-items: center; padding: 15px 20px; border-top: 1px solid #e9ecef; background: #f8f9fa;">
-                <span style="color: #6c757d; font-size: 14px;">
-                    {((current_page-1) * 10) + 1}-{min(current_page * 10, total_count)} / {total_count}
-                </span>
-                <div style="display: flex; gap: 5px;">
-                    <a href="{prev_link}" style="padding: 6px 12px; background: {'#e9ecef' if prev_disabled else '#007bff'}; color: {'#6c757d' if prev_disabled else 'white'}; text-decoration: none; border-radius: 4px; font-size: 14px; {'pointer-events: none;' if prev_disabled else ''}">‹</a>
-                    <a href="{next_link}" style="padding: 6px 12px; background: {'#e9ecef' if next_disabled else '#007bff'}; color: {'#6c757d' if next_disabled else 'white'}; text-decoration: none; border-radius: 4px; font-size: 14px; {'pointer-events: none;' if next_disabled else ''}">›</a>
-                </div>
-            </div>
-            """
-        
-        # Build status filters
-        status_filters = f"""
-        <div style="margin-bottom: 20px;">
-            <h6 style="margin: 0 0 10px 0; color: #495057; font-size: 12px; text-transform: uppercase; font-weight: 600;">STATUS</h6>
-            <div style="display: flex; flex-direction: column; gap: 5px;">
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status=all&department={department_filter}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if status_filter == 'all' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if status_filter == 'all' else 'transparent'}; font-size: 14px;">
-                   All
-                </a>
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status=to_approve&department={department_filter}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if status_filter == 'to_approve' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if status_filter == 'to_approve' else 'transparent'}; font-size: 14px;">
-                   To Approve
-                </a>
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status=second_approval&department={department_filter}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if status_filter == 'second_approval' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if status_filter == 'second_approval' else 'transparent'}; font-size: 14px;">
-                   Second Approval
-                </a>
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status=approved&department={department_filter}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if status_filter == 'approved' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if status_filter == 'approved' else 'transparent'}; font-size: 14px;">
-                   Approved
-                </a>
-            </div>
-        </div>
-        """
-        
-        # Build department filters
-        department_filters = ""
-        if departments:
-            dept_links = f"""
-            <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status={status_filter}&department=all&search={search_term}" 
-               style="padding: 8px 12px; color: {'#007bff' if department_filter == 'all' else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if department_filter == 'all' else 'transparent'}; font-size: 14px; display: block;">
-               All
-            </a>
-            """
-            for dept in sorted(departments):
-                dept_links += f"""
-                <a href="?token={kw.get('token', '')}&approver_id={approver.id}&status={status_filter}&department={dept}&search={search_term}" 
-                   style="padding: 8px 12px; color: {'#007bff' if department_filter == dept else '#6c757d'}; text-decoration: none; border-radius: 4px; background: {'#e3f2fd' if department_filter == dept else 'transparent'}; font-size: 14px; display: block;">
-                   {dept}
-                </a>
-                """
-            
-            department_filters = f"""
-            <div>
-                <h6 style="margin: 0 0 10px 0; color: #495057; font-size: 12px; text-transform: uppercase; font-weight: 600;">DEPARTMENT</h6>
-                <div style="display: flex; flex-direction: column; gap: 5px;">
-                    {dept_links}
-                </div>
-            </div>
-            """
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>All Time Off</title>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <style>
-                * {{
-                    margin: 0;
-                    padding: 0;
-                    box-sizing: border-box;
-                }}
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Arial, sans-serif;
-                    background: #f8f9fa;
-                    color: #495057;
-                    font-size: 14px;
-                }}
-                .header {{
-                    background: white;
-                    border-bottom: 1px solid #dee2e6;
-                    padding: 15px 20px;
-                    display: flex;
-                    justify-content: space-between;
-                    align-items: center;
-                }}
-                .header h1 {{
-                    font-size: 18px;
-                    font-weight: 600;
-                    color: #495057;
-                }}
-                .search-box {{
-                    position: relative;
-                }}
-                .search-box input {{
-                    padding: 8px 12px;
-                    border: 1px solid #ced4da;
-                    border-radius: 4px;
-                    font-size: 14px;
-                    width: 300px;
-                }}
-                .search-box button {{
-                    position: absolute;
-                    right: 5px;
-                    top: 50%;
-                    transform: translateY(-50%);
-                    background: none;
-                    border: none;
-                    cursor: pointer;
-                    padding: 5px;
-                }}
-                .main-content {{
-                    display: flex;
-                    min-height: calc(100vh - 60px);
-                }}
-                .sidebar {{
-                    width: 200px;
-                    background: white;
-                    border-right: 1px solid #dee2e6;
-                    padding: 20px;
-                }}
-                .content-area {{
-                    flex: 1;
-                    background: white;
-                    margin: 0;
-                }}
-                .table-container {{
-                    overflow-x: auto;
-                }}
-                table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                    background: white;
-                }}
-                th {{
-                    background: #f8f9fa;
-                    padding: 12px;
-                    text-align: left;
-                    font-weight: 600;
-                    color: #495057;
-                    border-bottom: 2px solid #dee2e6;
-                    font-size: 12px;
-                    text-transform: uppercase;
-                }}
-                .filter-section {{
-                    margin-bottom: 30px;
-                }}
-                .no-results {{
-                    text-align: center;
-                    color: #6c757d;
-                    padding: 60px 20px;
-                    font-size: 16px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>All Time Off</h1>
-                <form class="search-box" method="GET" action="/leave/view_requests">
-                    <input type="hidden" name="token" value="{kw.get('token', '')}">
-                    <input type="hidden" name="approver_id" value="{approver.id}">
-                    <input type="hidden" name="status" value="{status_filter}">
-                    <input type="hidden" name="department" value="{department_filter}">
-                    <input type="text" name="search" value="{search_term}" placeholder="Search...">
-                    <button type="submit">🔍</button>
-                </form>
-            </div>
-            
-            <div class="main-content">
-                <div class="sidebar">
-                    <div class="filter-section">
-                        {status_filters}
-                    </div>
-                    {department_filters}
-                </div>
-                
-                <div class="content-area">
-                    <div class="table-container">
-                        {'<table>' if table_rows else ''}
-                        {'<thead><tr><th>Employee</th><th>Time Off Type</th><th>Description</th><th>From Date</th><th>To Date</th><th>Created Date</th><th>Duration</th><th>Status</th></tr></thead>' if table_rows else ''}
-                        {'<tbody>' + table_rows + '</tbody>' if table_rows else ''}
-                        {'</table>' if table_rows else ''}
-                        
-                        {('<div class="no-results">No time off requests found matching your criteria.</div>') if not table_rows else ''}
-                    </div>
-                    {pagination_html}
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        return html_content
-    
+        token = kw.get('token', '')
+
+        def filter_url(**overrides):
+            params = {
+                'token': token,
+                'approver_id': approver.id,
+                'status': status_filter,
+                'department': department_filter,
+                'search': search_term,
+                'page': current_page,
+            }
+            params.update(overrides)
+            return '?' + urlencode({key: value for key, value in params.items() if value is not None})
+
+        return self._render_template('leave_approver.leave_requests_page', {
+            'leaves': leaves,
+            'approver': approver,
+            'token': token,
+            'status_filter': status_filter,
+            'department_filter': department_filter,
+            'search_term': search_term,
+            'status_counts': status_counts,
+            'departments': departments,
+            'current_page': current_page,
+            'total_pages': total_pages,
+            'total_count': total_count,
+            'pending_ids': pending_ids,
+            'per_page': PER_PAGE,
+            'status_filters': STATUS_FILTERS,
+            'status_labels': STATUS_LABELS,
+            'filter_url': filter_url,
+        })
+
     def _render_error_page(self, error_message):
         """Render error page"""
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Error</title>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1">
-            <style>
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-                    background: #f8f9fa;
-                    margin: 0;
-                    padding: 20px;
-                    min-height: 100vh;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                }}
-                .container {{
-                    background: white;
-                    border-radius: 12px;
-                    padding: 40px;
-                    text-align: center;
-                    max-width: 400px;
-                    border: 1px solid #dc3545;
-                    box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-                }}
-                .error-icon {{
-                    font-size: 60px;
-                    color: #dc3545;
-                    margin-bottom: 20px;
-                }}
-                h1 {{
-                    color: #dc3545;
-                    margin-bottom: 15px;
-                    font-size: 24px;
-                }}
-                p {{
-                    margin-bottom: 10px;
-                    line-height: 1.6;
-                }}
-                .help-text {{
-                    color: #6c757d;
-                    font-size: 14px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="error-icon">❌</div>
-                <h1>Error</h1>
-                <p>{error_message}</p>
-                <p class="help-text">Please contact your HR administrator for assistance.</p>
-            </div>
-        </body>
-        </html>
-        """
-        return html_content
\ No newline at end of file
+        return self._render_template('leave_approver.leave_error_page', {
+            'error_message': error_message,
+        })
+
+    def _render_template(self, template, values):
+        """Render a compiled QWeb template into an HTML response"""
+        with approval_stage(request.env, 'render', template=template):
+            html = request.env['ir.qweb'].sudo()._render(template, values)
+        return request.make_response(html, headers=[('Content-Type', 'text/html; charset=utf-8')])
@@ -1,2 +1,10 @@
 from . import hr_leave_custom
-from . import debug_email
\ No newline at end of file
+from . import hr_leave_index
+from . import hr_leave_approver_inbox
+from . import hr_leave_approval_token
+from . import hr_leave_notification
+from . import hr_leave_approval_report
+from . import hr_employee
+from . import mail_template
+from . import debug_email
+from . import res_users
\ No newline at end of file
@@ -18,16 +18,18 @@ class HrLeaveEmailDebug(models.Model):
         else:
             _logger.warning("No mail servers configured!")
         
-        # Check outgoing mail queue
-        pending_mails = self.env['mail.mail'].search([('state', '=', 'outgoing')])
-        _logger.info(f"Pending emails in queue: {len(pending_mails)}")
-        
-        # Check failed mails
-        failed_mails = self.env['mail.mail'].search([('state', '=', 'exception')])
-        if failed_mails:
-            _logger.warning(f"Failed emails: {len(failed_mails)}")
-            for mail in failed_mails[:5]:  # Show first 5 failed emails
-                _logger.warning(f"Failed email to {mail.email_to}: {mail.failure_reason}")
+        # Check approval email deliveries, from the notification ledger
+        Notification = self.env['hr.leave.notification'].sudo()
+        for (stage, state), health in sorted(Notification._get_delivery_health().items()):
+            _logger.info(f"Approval emails {stage}/{state} (7 days): {health['count']}, "
+                         f"avg latency {health['avg_latency_ms'] or 0:.0f} ms, max attempts {health['max_attempts']}")
+
+        # Check failed deliveries, most recent first
+        failed = Notification.search([('state', '=', 'failed')], order='id desc', limit=5)
+        for notification in failed:  # Show last 5 failed emails
+            _logger.warning(f"Failed email to {notification.email_to} ({notification.stage}, "
+                            f"{notification.attempt_count} attempts, next retry {notification.next_retry_at or 'none'}): "
+                            f"{notification.failure_reason}")
         
         # Check system parameters
         catchall = self.env['ir.config_parameter'].sudo().get_param('mail.catchall.domain')
@@ -0,0 +1,39 @@
+from odoo import models
+
+# hr.employee fields the leave approvers are derived from
+APPROVER_SOURCE_FIELDS = {'leave_manager_id', 'hr_officer_ids'}
+
+
+class HrEmployee(models.Model):
+    _inherit = 'hr.employee'
+
+    def _get_approver_trigger_fields(self):
+        """Fields whose write may change the approver sources, including the
+        dependencies of computed ones (hr_holidays computes leave_manager_id
+        from parent_id)"""
+        names = set(APPROVER_SOURCE_FIELDS)
+        for fname in APPROVER_SOURCE_FIELDS:
+            field = self._fields.get(fname)
+            if field and field.compute:
+                depends, _depends_context = field.get_depends(self)
+                names.update(path.split('.')[0] for path in depends)
+        return names
+
+    def _get_approver_sources(self):
+        return {
+            employee.id: (employee.leave_manager_id.id, frozenset(employee.hr_officer_ids.ids))
+            for employee in self.sudo()
+        }
+
+    def write(self, vals):
+        if not self._get_approver_trigger_fields().intersection(vals):
+            return super().write(vals)
+
+        # Compare rather than trust vals: computed sources change without being in them
+        before = self._get_approver_sources()
+        result = super().write(vals)
+        after = self._get_approver_sources()
+        changed = self.filtered(lambda employee: before[employee.id] != after[employee.id])
+        if changed:
+            self.env['hr.leave']._recompute_open_approvers(changed)
+        return result
@@ -0,0 +1,79 @@
+from odoo import models, fields, tools
+from odoo.tools import SQL
+
+# read_group aggregates computed as percentiles, e.g. 'latency_hours:p95'
+PERCENTILE_AGGREGATES = {
+    'p50': 0.5,
+    'p95': 0.95,
+}
+
+
+class HrLeaveApprovalReport(models.Model):
+    """Time each leave waited at each approval stage.
+
+    One row per decision, read from the stage timestamps stored on hr.leave.
+    On top of the usual aggregates, ``_read_group`` accepts ``p50`` and
+    ``p95``::
+
+        env['hr.leave.approval.report']._read_group(
+            [('stage', '=', 'first')], ['approver_id'],
+            ['latency_hours:p50', 'latency_hours:p95', '__count'])
+    """
+    _name = 'hr.leave.approval.report'
+    _description = 'Leave Approval Latency'
+    _auto = False
+    _order = 'decided_at desc'
+
+    leave_id = fields.Many2one('hr.leave', string="Leave", readonly=True)
+    stage = fields.Selection([
+        ('first', 'First Approval'),
+        ('second', 'Second Approval'),
+        ('refusal', 'Refusal'),
+    ], string="Stage", readonly=True)
+    approver_id = fields.Many2one('res.users', string="Approver", readonly=True)
+    department_id = fields.Many2one('hr.department', string="Department", readonly=True)
+    employee_id = fields.Many2one('hr.employee', string="Employee", readonly=True)
+    holiday_status_id = fields.Many2one('hr.leave.type', string="Time Off Type", readonly=True)
+    requested_at = fields.Datetime(string="Waiting Since", readonly=True)
+    decided_at = fields.Datetime(string="Decided On", readonly=True)
+    latency_hours = fields.Float(string="Latency (Hours)", readonly=True, group_operator='avg')
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute(f"""
+            CREATE OR REPLACE VIEW {self._table} AS (
+                SELECT l.id * 3 AS id, l.id AS leave_id, 'first' AS stage,
+                       l.first_approved_by AS approver_id,
+                       l.department_id, l.employee_id, l.holiday_status_id,
+                       l.create_date AS requested_at, l.first_approved_at AS decided_at,
+                       EXTRACT(EPOCH FROM l.first_approved_at - l.create_date) / 3600.0 AS latency_hours
+                  FROM hr_leave l
+                 WHERE l.first_approved_at IS NOT NULL
+             UNION ALL
+                SELECT l.id * 3 + 1, l.id, 'second',
+                       l.second_approved_by,
+                       l.department_id, l.employee_id, l.holiday_status_id,
+                       l.first_approved_at, l.second_approved_at,
+                       EXTRACT(EPOCH FROM l.second_approved_at - l.first_approved_at) / 3600.0
+                  FROM hr_leave l
+                 WHERE l.second_approved_at IS NOT NULL AND l.first_approved_at IS NOT NULL
+             UNION ALL
+                SELECT l.id * 3 + 2, l.id, 'refusal',
+                       l.refused_by,
+                       l.department_id, l.employee_id, l.holiday_status_id,
+                       COALESCE(l.second_approved_at, l.first_approved_at, l.create_date), l.refused_at,
+                       EXTRACT(EPOCH FROM l.refused_at - COALESCE(l.second_approved_at, l.first_approved_at, l.create_date)) / 3600.0
+                  FROM hr_leave l
+                 WHERE l.refused_at IS NOT NULL
+            )
+        """)
+
+    def _read_group_select(self, aggregate_spec, query):
+        fname, __, func = aggregate_spec.partition(':')
+        if func in PERCENTILE_AGGREGATES and fname in self._fields:
+            return SQL(
+                "percentile_cont(%s) WITHIN GROUP (ORDER BY %s)",
+                PERCENTILE_AGGREGATES[func],
+                SQL.identifier(query.table, fname),
+            )
+        return super()._read_group_select(aggregate_spec, query)
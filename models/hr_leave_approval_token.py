@@ -0,0 +1,97 @@
+from odoo import models, fields, api
+from datetime import timedelta
+import hashlib
+import logging
+import secrets
+
+_logger = logging.getLogger(__name__)
+
+TOKEN_VALIDITY_PARAM = 'leave_approver.token_validity_days'
+DEFAULT_TOKEN_VALIDITY_DAYS = 7
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class HrLeaveApprovalToken(models.Model):
+    """Access tokens put in approval email links.
+
+    Only the SHA-256 of a token is stored; the token itself exists in the
+    email it was issued for. Verification is a single lookup on the unique
+    ``token_hash`` index. A token stays valid, for as many visits as needed,
+    until its expiry; expired tokens are deleted by the autovacuum.
+    """
+    _name = 'hr.leave.approval.token'
+    _description = 'Leave Approval Token'
+    _order = 'id desc'
+
+    leave_id = fields.Many2one('hr.leave', string="Leave", required=True, ondelete='cascade', index=True)
+    user_id = fields.Many2one('res.users', string="Approver", ondelete='cascade',
+                              help="Approver the link was sent to, if it was sent to a single one")
+    token_hash = fields.Char(string="Token Hash", required=True, readonly=True)
+    expiry = fields.Datetime(string="Expires On", required=True, readonly=True)
+
+    _sql_constraints = [
+        ('token_hash_uniq', 'unique(token_hash)', "Approval token hashes must be unique."),
+    ]
+
+    def init(self):
+        # Tokens used to be stored in clear on hr_leave.approval_token: keep
+        # the links already sent working, then drop the clear values
+        self._cr.execute("""
+            SELECT 1 FROM information_schema.columns
+             WHERE table_name = 'hr_leave' AND column_name = 'approval_token'
+        """)
+        if not self._cr.fetchone():
+            return
+        self._cr.execute(f"""
+            INSERT INTO {self._table} (leave_id, token_hash, expiry, create_uid, create_date, write_uid, write_date)
+                 SELECT id, encode(sha256(approval_token::bytea), 'hex'),
+                        (now() at time zone 'UTC') + %s * interval '1 day',
+                        1, now() at time zone 'UTC', 1, now() at time zone 'UTC'
+                   FROM hr_leave
+                  WHERE approval_token IS NOT NULL
+            ON CONFLICT (token_hash) DO NOTHING
+        """, [self._get_validity_days()])
+        if self._cr.rowcount:
+            _logger.info("Migrated %s clear approval tokens to hashed tokens", self._cr.rowcount)
+        self._cr.execute("UPDATE hr_leave SET approval_token = NULL WHERE approval_token IS NOT NULL")
+
+    @api.model
+    def _get_validity_days(self):
+        value = self.env['ir.config_parameter'].sudo().get_param(TOKEN_VALIDITY_PARAM)
+        try:
+            return int(value) if value else DEFAULT_TOKEN_VALIDITY_DAYS
+        except ValueError:
+            return DEFAULT_TOKEN_VALIDITY_DAYS
+
+    @api.model
+    def _issue(self, leave, user=None, validity_days=None):
+        """Create a token for ``leave`` (and ``user``) and return it in clear"""
+        token = secrets.token_urlsafe(32)
+        if validity_days is None:
+            validity_days = self._get_validity_days()
+        self.sudo().create({
+            'leave_id': leave.id,
+            'user_id': user.id if user else False,
+            'token_hash': hash_token(token),
+            'expiry': fields.Datetime.now() + timedelta(days=validity_days),
+        })
+        return token
+
+    @api.model
+    def _verify(self, token):
+        """Return the unexpired token record matching ``token``, or an empty recordset"""
+        if not token:
+            return self.browse()
+        return self.sudo().search([
+            ('token_hash', '=', hash_token(token)),
+            ('expiry', '>', fields.Datetime.now()),
+        ], limit=1)
+
+    @api.autovacuum
+    def _gc_expired_tokens(self):
+        """Delete expired tokens: one is issued per approval email sent"""
+        self._cr.execute(f"DELETE FROM {self._table} WHERE expiry < now() at time zone 'UTC'")
+        _logger.info("Deleted %s expired approval tokens", self._cr.rowcount)
@@ -0,0 +1,85 @@
+from odoo import models, fields, api, tools
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Inbox rows still waiting for a decision of their approver
+PENDING_DECISION_DOMAIN = [
+    '|',
+    '&', ('stage', '=', 'first'), ('state', '=', 'confirm'),
+    '&', ('stage', '=', 'second'), ('state', '=', 'validate1'),
+]
+
+
+class HrLeaveApproverInbox(models.Model):
+    """One row per (approver, leave, stage), mirroring the leave state.
+
+    Maintained by hr.leave whenever approvers are computed or the state
+    changes, so "what do I need to approve" is a range scan on
+    ``(user_id, state, stage, create_date)`` instead of an OR over
+    ``first_approver_id`` and the second approver relation.
+    """
+    _name = 'hr.leave.approver.inbox'
+    _description = 'Leave Approver Inbox'
+    _log_access = False
+    _order = 'create_date desc, leave_id desc'
+
+    user_id = fields.Many2one('res.users', string="Approver", required=True, ondelete='cascade')
+    leave_id = fields.Many2one('hr.leave', string="Leave", required=True, ondelete='cascade', index=True)
+    stage = fields.Selection([
+        ('first', 'First Approval'),
+        ('second', 'Second Approval'),
+    ], string="Stage", required=True)
+    state = fields.Selection(selection='_selection_state', string="Status")
+    create_date = fields.Datetime(string="Requested On", readonly=True)
+
+    _sql_constraints = [
+        ('leave_user_stage_uniq', 'unique(leave_id, user_id, stage)', "An approver appears once per leave and stage."),
+    ]
+
+    @api.model
+    def _selection_state(self):
+        return self.env['hr.leave']._fields['state']._description_selection(self.env)
+
+    def init(self):
+        tools.create_index(
+            self._cr, 'hr_leave_approver_inbox_user_state_idx', self._table,
+            ['user_id', 'state', 'stage', 'create_date DESC', 'leave_id DESC'],
+        )
+        # Fill the inbox once when the module is installed on existing data,
+        # straight from hr_leave: no id list to bind on large databases
+        self._cr.execute(f"SELECT 1 FROM {self._table} LIMIT 1")
+        if not self._cr.fetchone():
+            _logger.info("Filling approver inbox from existing leaves")
+            self._insert_rows("TRUE")
+
+    @api.model
+    def _refresh(self, leave_ids):
+        """Rebuild the rows of ``leave_ids`` from the stored approvers"""
+        leave_ids = tuple(leave_ids)
+        self._cr.execute(f"DELETE FROM {self._table} WHERE leave_id IN %s", [leave_ids])
+        self._insert_rows("l.id IN %s", [leave_ids])
+        self.invalidate_model()
+
+    @api.model
+    def _insert_rows(self, where, params=()):
+        """Insert the rows of the leaves matching ``where`` (on ``hr_leave l``)"""
+        self._cr.execute(f"""
+            INSERT INTO {self._table} (user_id, leave_id, stage, state, create_date)
+                 SELECT l.first_approver_id, l.id, 'first', l.state, l.create_date
+                   FROM hr_leave l
+                  WHERE {where} AND l.first_approver_id IS NOT NULL
+              UNION ALL
+                 SELECT r.user_id, l.id, 'second', l.state, l.create_date
+                   FROM hr_leave l
+                   JOIN hr_leave_second_approver_rel r ON r.leave_id = l.id
+                  WHERE {where}
+        """, [*params, *params])
+
+    @api.model
+    def _update_state(self, leave_ids, state):
+        self._cr.execute(
+            f"UPDATE {self._table} SET state = %s WHERE leave_id IN %s AND state IS DISTINCT FROM %s",
+            [state, tuple(leave_ids), state],
+        )
+        self.invalidate_model(['state'])
@@ -1,10 +1,30 @@
 from odoo import models, fields, api
 from odoo.exceptions import UserError
+from odoo.tools import split_every
+from ..tools.instrumentation import approval_stage, instrumented, profiled
 import logging
-import secrets
 
 _logger = logging.getLogger(__name__)
 
+# States in which a leave still waits for a decision
+PENDING_STATES = ('draft', 'confirm', 'validate1')
+
+# (time, user) fields stamped when a leave reaches each decision state
+STAGE_STAMP_FIELDS = {
+    'validate1': ('first_approved_at', 'first_approved_by'),
+    'validate': ('second_approved_at', 'second_approved_by'),
+    'refuse': ('refused_at', 'refused_by'),
+}
+
+# hr.leave fields the approver inbox rows are built from
+APPROVER_FIELDS = {'employee_id', 'first_approver_id', 'second_approver_ids'}
+
+# Dashboard bulk actions and the leave method applying them
+BULK_ACTIONS = {
+    'approve': 'action_approve',
+    'refuse': 'action_refuse',
+}
+
 class HrLeave(models.Model):
     _inherit = 'hr.leave'
 
@@ -13,7 +33,8 @@ class HrLeave(models.Model):
         string="First Approver",
         compute='_compute_approvers', 
         store=True, 
-        readonly=True
+        readonly=True,
+        precompute=True
     )
     second_approver_ids = fields.Many2many(
         'res.users',
@@ -22,350 +43,336 @@ class HrLeave(models.Model):
         'user_id',
         string="Second Approvers",
         compute='_compute_approvers', 
-        store=True
+        store=True,
+        precompute=True
+    )
+    approver_inbox_ids = fields.One2many('hr.leave.approver.inbox', 'leave_id', string="Approver Inbox")
+    approver_search_text = fields.Char(
+        string="Approver Search Text",
+        compute='_compute_approver_search_text',
+        store=True,
+        index='trigram',
+        help="Employee, time off type, description and department, searched by the approver dashboard",
     )
-    approval_token = fields.Char(string="Approval Token")
+    first_approved_at = fields.Datetime(string="First Approval On", readonly=True, copy=False)
+    first_approved_by = fields.Many2one('res.users', string="First Approval By", readonly=True, copy=False)
+    second_approved_at = fields.Datetime(string="Second Approval On", readonly=True, copy=False)
+    second_approved_by = fields.Many2one('res.users', string="Second Approval By", readonly=True, copy=False)
+    refused_at = fields.Datetime(string="Refused On", readonly=True, copy=False)
+    refused_by = fields.Many2one('res.users', string="Refused By", readonly=True, copy=False)
 
-    @api.depends('employee_id', 'employee_id.leave_manager_id', 'employee_id.hr_officer_ids')
+    # Approvers of leaves in other states are frozen: changing an employee's
+    # manager or HR officers only recomputes their open requests, see
+    # hr.employee.write and _recompute_open_approvers.
+    @api.depends('employee_id')
     def _compute_approvers(self):
         for leave in self:
-            leave.first_approver_id = False
-            leave.second_approver_ids = [(6, 0, [])]
-
-            employee = leave.employee_id
-            if not employee:
-                continue
+            first_approver, second_approvers = self._get_employee_approvers(leave.employee_id)
+            leave.first_approver_id = first_approver
+            leave.second_approver_ids = [(6, 0, second_approvers.ids)]
 
-            # First approver = manager
-            if employee.leave_manager_id and employee.leave_manager_id.active:
-                leave.first_approver_id = employee.leave_manager_id.id
+    @api.model
+    def _get_employee_approvers(self, employee):
+        """Return the (first approver, second approvers) of ``employee``'s leaves"""
+        # First approver = manager
+        manager = employee.leave_manager_id
+        first_approver = manager if manager and manager.active else manager.browse()
+        # Second approvers = hr_officer_ids (including manager if present)
+        return first_approver, employee.hr_officer_ids
 
-            # Second approvers = hr_officer_ids (including manager if present)
-            if employee.hr_officer_ids:
-                officer_ids = employee.hr_officer_ids.ids
-                leave.second_approver_ids = [(6, 0, officer_ids)]
-                _logger.info("Leave %s: Second approvers set to %s", leave.id, officer_ids)
+    @api.depends('employee_id.name', 'holiday_status_id.name', 'private_name', 'employee_id.department_id.name')
+    def _compute_approver_search_text(self):
+        for leave in self:
+            # one value per line so a term never matches across two fields
+            leave.approver_search_text = '\n'.join(filter(None, [
+                leave.employee_id.name,
+                leave.holiday_status_id.name,
+                leave.private_name,
+                leave.employee_id.department_id.name,
+            ]))
 
     @api.model
-    def create(self, vals):
-        record = super().create(vals)
-        record._generate_approval_token()
-        record._compute_approvers()   # 🔑 force compute after create
-        return record
+    def _recompute_open_approvers(self, employees, batch_size=1000):
+        """Recompute the approvers of the pending leaves of ``employees``, in batches"""
+        leaves = self.sudo().search([
+            ('employee_id', 'in', employees.ids),
+            ('state', 'in', PENDING_STATES),
+        ])
+        approver_fields = [self._fields['first_approver_id'], self._fields['second_approver_ids']]
+        for batch in split_every(batch_size, leaves.ids, leaves.browse):
+            for field in approver_fields:
+                self.env.add_to_compute(field, batch)
+            batch.flush_recordset(['first_approver_id', 'second_approver_ids'])
+            batch._sync_approver_inbox()
+            batch.invalidate_recordset()
+
+    def _sync_approver_inbox(self):
+        """Rebuild the approver inbox rows of these leaves from their approvers"""
+        if self.ids:
+            self.flush_recordset(['state', 'first_approver_id', 'second_approver_ids'])
+            self.env['hr.leave.approver.inbox']._refresh(self.ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        leaves = super().create(vals_list)
+        leaves._sync_approver_inbox()
+        return leaves
 
+    @profiled('action_approve')
+    @instrumented('action_approve')
     def action_approve(self):
-        _logger.info("=== ACTION APPROVE CALLED ===")
-        _logger.info("Current user: %s (ID: %s)", self.env.user.name, self.env.user.id)
-        
         current_user = self.env.user
+        to_first = self.filtered(lambda l: l.state == 'confirm')
+        to_second = self.filtered(lambda l: l.state == 'validate1')
+
+        with approval_stage(self.env, 'action_approve.check', records=len(self)):
+            errors = to_first._get_first_approval_errors(current_user)
+            errors.update(to_second._get_second_approval_errors(current_user))
+        # Report the same leave the sequential path would have stopped at
         for leave in self:
-            _logger.info("Processing leave %s with state: %s", leave.id, leave.state)
-            
-            try:
-                # First approval
-                if leave.state == 'confirm':
-                    _logger.info("Processing first approval for leave %s", leave.id)
-                    
-                    if not leave.first_approver_id:
-                        _logger.error("No first approver configured for leave %s", leave.id)
-                        raise UserError("No first approver configured for this employee.")
-                        
-                    if current_user != leave.first_approver_id:
-                        _logger.error("Wrong approver for first approval. Current: %s, Expected: %s", 
-                                    current_user.name, leave.first_approver_id.name)
-                        raise UserError("Only the designated first approver can approve at this stage.")
-
-                    _logger.info("Moving leave %s from 'confirm' to 'validate1'", leave.id)
-                    leave.write({'state': 'validate1'})
-                    leave._send_second_approval_notification()
-
-                # Second approval
-                elif leave.state == 'validate1':
-                    _logger.info("Processing second approval for leave %s", leave.id)
-                    
-                    # Case 1: Second approvers exist
-                    if leave.second_approver_ids:
-                        _logger.info("Second approvers exist: %s", [a.name for a in leave.second_approver_ids])
-                        
-                        if current_user == leave.first_approver_id:
-                            _logger.error("First approver cannot approve at second stage")
-                            raise UserError("The first approver cannot approve at the second stage.")
-                            
-                        if current_user not in leave.second_approver_ids:
-                            _logger.error("Current user %s not in second approvers: %s", 
-                                        current_user.name, [a.name for a in leave.second_approver_ids])
-                            raise UserError("Only designated second approvers can approve at this stage.")
-                            
-                    # Case 2: No second approvers configured → first approver can finalize
-                    else:
-                        _logger.info("No second approvers, first approver can finalize")
-                        if current_user != leave.first_approver_id:
-                            _logger.error("Only first approver can finalize when no second approvers")
-                            raise UserError("Only the first approver can finalize this leave request.")
-
-                    _logger.info("Moving leave %s from 'validate1' to 'validate'", leave.id)
-                    leave.write({'state': 'validate'})
-                    
-                    _logger.info("About to call _send_leave_approved_notification for leave %s", leave.id)
-                    leave._send_leave_approved_notification()
-                    _logger.info("Finished calling _send_leave_approved_notification for leave %s", leave.id)
-                
-                # Already approved
-                elif leave.state == 'validate':
-                    _logger.info("Leave %s is already in 'validate' state", leave.id)
-                    
-                else:
-                    _logger.warning("Unexpected state for leave %s: %s", leave.id, leave.state)
-                    
-            except Exception as e:
-                _logger.error("Exception in action_approve for leave %s: %s", leave.id, str(e))
-                _logger.exception("Full exception details:")
-                raise
-
-        _logger.info("=== ACTION APPROVE COMPLETED ===")
+            if leave.id in errors:
+                _logger.warning("Approval refused for leave %s: %s", leave.id, errors[leave.id])
+                raise UserError(errors[leave.id])
+
+        unexpected = self.filtered(lambda l: l.state not in ('confirm', 'validate1', 'validate'))
+        if unexpected:
+            _logger.warning("Unexpected state for leaves %s", unexpected.ids)
+
+        if to_first:
+            with approval_stage(self.env, 'action_approve.first', records=len(to_first)):
+                to_first.write({'state': 'validate1'})
+                to_first._send_second_approval_notification()
+
+        if to_second:
+            with approval_stage(self.env, 'action_approve.second', records=len(to_second)):
+                # write() queues the approved notifications
+                to_second.write({'state': 'validate'})
+
         return True
 
+    def _apply_bulk_action(self, action):
+        """Approve or refuse the leaves, returning ``{leave_id: error message or False}``.
+
+        The whole recordset goes through the regular action first; if any leave
+        is rejected, that attempt is rolled back and each leave is processed on
+        its own so the others still go through.
+        """
+        method = BULK_ACTIONS[action]
+        try:
+            with approval_stage(self.env, 'bulk.' + action, records=len(self)), self.env.cr.savepoint():
+                getattr(self, method)()
+            return dict.fromkeys(self.ids, False)
+        except UserError:
+            pass
+
+        results = {}
+        for leave in self:
+            try:
+                with self.env.cr.savepoint():
+                    getattr(leave, method)()
+                results[leave.id] = False
+            except UserError as e:
+                results[leave.id] = e.args[0]
+        return results
+
+    def _get_first_approval_errors(self, user):
+        """Map leave ids in ``confirm`` that ``user`` may not approve to the reason"""
+        no_approver = self.filtered(lambda l: not l.first_approver_id)
+        wrong_approver = self.filtered(lambda l: l.first_approver_id != user) - no_approver
+        errors = dict.fromkeys(no_approver.ids, "No first approver configured for this employee.")
+        errors.update(dict.fromkeys(wrong_approver.ids, "Only the designated first approver can approve at this stage."))
+        return errors
+
+    def _get_second_approval_errors(self, user):
+        """Map leave ids in ``validate1`` that ``user`` may not approve to the reason"""
+        with_second = self.filtered('second_approver_ids')
+        without_second = self - with_second
+
+        # Case 1: Second approvers exist
+        first_approver = with_second.filtered(lambda l: l.first_approver_id == user)
+        not_second_approver = with_second.filtered(lambda l: user not in l.second_approver_ids) - first_approver
+        # Case 2: No second approvers configured → first approver can finalize
+        not_finalizer = without_second.filtered(lambda l: l.first_approver_id != user)
+
+        errors = dict.fromkeys(first_approver.ids, "The first approver cannot approve at the second stage.")
+        errors.update(dict.fromkeys(not_second_approver.ids, "Only designated second approvers can approve at this stage."))
+        errors.update(dict.fromkeys(not_finalizer.ids, "Only the first approver can finalize this leave request."))
+        return errors
+
+    @profiled('action_confirm')
+    @instrumented('action_confirm')
     def action_confirm(self):
         """Send email to first approver after confirmation."""
-        _logger.info("=== ACTION CONFIRM CALLED ===")
-        _logger.info("Current user: %s", self.env.user.name)
-        
         result = super(HrLeave, self).action_confirm()
-        
-        for leave in self:
-            _logger.info("Leave %s state after confirm: %s", leave.id, leave.state)
-            if leave.state == 'confirm':
-                _logger.info("Sending first approval notification for leave %s", leave.id)
-                leave._send_first_approval_notification()
-            else:
-                _logger.warning("Leave %s not in 'confirm' state, current state: %s", leave.id, leave.state)
-                
+        self.filtered(lambda l: l.state == 'confirm')._send_first_approval_notification()
+
         return result
 
+    @profiled('action_refuse')
+    def action_refuse(self):
+        return super(HrLeave, self).action_refuse()
+
+    @instrumented('notify.first_approval')
     def _send_first_approval_notification(self):
-        """Send notification to first approver"""
-        _logger.info("=== SENDING FIRST APPROVAL NOTIFICATION ===")
-        _logger.info("Leave ID: %s", self.id)
-        
-        if not self.first_approver_id:
-            _logger.error("No first approver for leave %s", self.id)
-            return
-            
-        _logger.info("First approver: %s (ID: %s)", self.first_approver_id.name, self.first_approver_id.id)
-            
-        if not self.first_approver_id.email:
-            _logger.error("First approver %s has no email for leave %s", self.first_approver_id.login, self.id)
-            return
-            
-        _logger.info("First approver email: %s", self.first_approver_id.email)
-        
-        template = self.env.ref('leave_approver.email_template_first_approval', raise_if_not_found=False)
-        if template:
-            _logger.info("Found email template: %s (ID: %s)", template.name, template.id)
-            
-            try:
-                # Create proper context for template rendering
-                template_ctx = {
-                    'lang': self.first_approver_id.lang or 'en_US',
-                    'force_email': True,
-                    'default_composition_mode': 'comment',
-                    'mark_so_as_sent': True,
-                }
-                
-                # Send email with proper context
-                mail_id = template.with_context(**template_ctx).send_mail(
-                    self.id, 
-                    force_send=True,
-                    email_values={
-                        'email_to': self.first_approver_id.email,
-                        'recipient_ids': [(4, self.first_approver_id.partner_id.id)] if self.first_approver_id.partner_id else []
-                    }
-                )
-                
-                _logger.info("First approval email sent for leave %s to %s (Mail ID: %s)", 
-                           self.id, self.first_approver_id.email, mail_id)
-                
-                # Verify mail was created and check content
-                if mail_id:
-                    mail_record = self.env['mail.mail'].browse(mail_id)
-                    _logger.info("Mail record - State: %s, Email to: %s, Subject: %s", 
-                               mail_record.state, mail_record.email_to, mail_record.subject)
-                    _logger.info("Mail body preview: %s", mail_record.body_html[:200] if mail_record.body_html else 'No body')
-                else:
-                    _logger.error("No mail ID returned from send_mail")
-                    
-            except Exception as e:
-                _logger.error("Failed sending first approval email for leave %s: %s", self.id, str(e))
-                _logger.exception("Full exception details:")
-        else:
-            _logger.error("Email template 'leave_approver.email_template_first_approval' not found")
-            # List available templates for debugging
-            all_templates = self.env['mail.template'].search([('model', '=', 'hr.leave')])
-            _logger.info("Available hr.leave templates: %s", [t.name for t in all_templates])
+        """Queue notifications to the first approver of each leave"""
+        vals_list = []
+        for leave in self:
+            approver = leave.first_approver_id
+            if not approver:
+                _logger.warning("No first approver for leave %s", leave.id)
+                continue
 
-    def _send_second_approval_notification(self):
-        """Send notification to second approvers (HR officers)."""
-        _logger.info("=== SENDING SECOND APPROVAL NOTIFICATION ===")
-        _logger.info("Leave ID: %s", self.id)
-        
-        if not self.second_approver_ids:
-            _logger.warning("No second approvers for leave %s", self.id)
-            return
+            if not approver.email:
+                _logger.warning("First approver %s has no email for leave %s", approver.id, leave.id)
+                continue
 
-        _logger.info("Second approvers: %s", [a.name for a in self.second_approver_ids])
+            if approver.leave_notification_mode == 'digest':
+                continue  # picked up by the next approval digest
 
-        template = self.env.ref(
-            'leave_approver.email_template_second_approval',
-            raise_if_not_found=False
-        )
-        if not template:
-            _logger.error("Email template 'leave_approver.email_template_second_approval' not found")
-            return
+            vals_list.append({
+                'leave_id': leave.id,
+                'stage': 'first_approval',
+                # email_to only: each recipient partner would get a separate SMTP message
+                'email_to': approver.email,
+                'recipient_user_id': approver.id,
+                'lang': approver.lang or 'en_US',
+            })
+        self.env['hr.leave.notification']._enqueue(vals_list)
 
-        for approver in self.second_approver_ids:
-            _logger.info("Processing second approver: %s", approver.name)
-            
-            if not approver.email:
-                _logger.warning("Second approver %s has no email, skipping", approver.login)
+    @instrumented('notify.second_approval')
+    def _send_second_approval_notification(self):
+        """Queue notifications to the second approvers (HR officers) of each leave.
+
+        Each officer gets their own message: the greeting and the dashboard
+        link are personal. The body is compiled once per language and only
+        evaluated per recipient, see mail.template._get_compiled_body.
+        """
+        vals_list = []
+        for leave in self:
+            if not leave.second_approver_ids:
+                _logger.warning("No second approvers for leave %s", leave.id)
                 continue
 
-            try:
-                template_ctx = {
+            for approver in leave.second_approver_ids:
+                if not approver.email:
+                    _logger.warning("Second approver %s has no email, skipping", approver.id)
+                    continue
+                if approver.leave_notification_mode == 'digest':
+                    continue
+                vals_list.append({
+                    'leave_id': leave.id,
+                    'stage': 'second_approval',
+                    # email_to only: each recipient partner would get a separate SMTP message
+                    'email_to': approver.email,
+                    'recipient_user_id': approver.id,
                     'lang': approver.lang or 'en_US',
-                    'force_email': True,
-                    'recipient_user': approver
-                }
-                
-                mail_id = template.with_context(**template_ctx).send_mail(
-                    self.id,
-                    force_send=True,
-                    email_values={
-                        'email_to': approver.email,
-                        'recipient_ids': [(4, approver.partner_id.id)] if approver.partner_id else []
-                    }
-                )
-
-                _logger.info("Second approval email sent for leave %s to %s (Mail ID: %s)",
-                           self.id, approver.email, mail_id)
-            except Exception as e:
-                _logger.error("Failed sending second approval email for leave %s to %s: %s",
-                           self.id, approver.email, str(e))
+                })
+        self.env['hr.leave.notification']._enqueue(vals_list)
 
+    @instrumented('notify.approved')
     def _send_leave_approved_notification(self):
-        """Send notification to employee when leave is approved"""
-        try:
-            _logger.info("=== SENDING LEAVE APPROVED NOTIFICATION ===")
-            _logger.info("Leave ID: %s", self.id)
-            _logger.info("Employee: %s", self.employee_id.name if self.employee_id else 'None')
-            
-            if not self.employee_id:
-                _logger.error("No employee for leave %s", self.id)
-                return
-                
-            if not self.employee_id.work_email:
-                _logger.error("No work email for employee %s (leave %s)", 
-                            self.employee_id.name, self.id)
-                return
-                
-            _logger.info("Employee work email: %s", self.employee_id.work_email)
-                
-            template = self.env.ref('leave_approver.email_template_leave_approved', raise_if_not_found=False)
-            if not template:
-                _logger.error("Email template 'leave_approver.email_template_leave_approved' not found")
-                # List available templates for debugging
-                all_templates = self.env['mail.template'].search([('model', '=', 'hr.leave')])
-                _logger.info("Available hr.leave templates: %s", [t.name for t in all_templates])
-                return
-                
-            _logger.info("Found email template: %s (ID: %s)", template.name, template.id)
-            
-            try:
-                template_ctx = {
-                    'lang': self.employee_id.user_id.lang if self.employee_id.user_id else 'en_US',
-                    'force_email': True,
-                }
-                
-                _logger.info("Sending email with context: %s", template_ctx)
-                
-                mail_id = template.with_context(**template_ctx).send_mail(
-                    self.id, 
-                    force_send=True,
-                    email_values={
-                        'email_to': self.employee_id.work_email,
-                        'recipient_ids': [(4, self.employee_id.user_id.partner_id.id)] if self.employee_id.user_id and self.employee_id.user_id.partner_id else []
-                    }
-                )
-                
-                _logger.info("Leave approved email sent for leave %s to %s (Mail ID: %s)",
-                           self.id, self.employee_id.work_email, mail_id)
-                           
-                # Verify mail was created and check content
-                if mail_id:
-                    mail_record = self.env['mail.mail'].browse(mail_id)
-                    _logger.info("Mail record - State: %s, Email to: %s, Subject: %s", 
-                               mail_record.state, mail_record.email_to, mail_record.subject)
-                else:
-                    _logger.error("No mail ID returned from send_mail")
-                    
-            except Exception as e:
-                _logger.error("Failed sending leave approved email for leave %s: %s", self.id, str(e))
-                _logger.exception("Full exception details:")
-                
-        except Exception as e:
-            _logger.error("Exception in _send_leave_approved_notification for leave %s: %s", self.id, str(e))
-            _logger.exception("Full exception details:")
+        """Queue notifications to the employee of each approved leave"""
+        vals_list = []
+        for leave in self:
+            if not leave.employee_id:
+                _logger.warning("No employee for leave %s", leave.id)
+                continue
+
+            if not leave.employee_id.work_email:
+                _logger.warning("No work email for employee %s (leave %s)",
+                                leave.employee_id.id, leave.id)
+                continue
+
+            user = leave.employee_id.user_id
+            vals_list.append({
+                'leave_id': leave.id,
+                'stage': 'approved',
+                # email_to only: each recipient partner would get a separate SMTP message
+                'email_to': leave.employee_id.work_email,
+                'lang': user.lang if user else 'en_US',
+            })
+        self.env['hr.leave.notification']._enqueue(vals_list)
 
     def write(self, vals):
         """Enforce approval rules also on direct write"""
-        _logger.info("=== WRITE METHOD CALLED ===")
-        _logger.info("Values: %s", vals)
-        _logger.info("Current user: %s", self.env.user.name)
-        
-        if 'state' in vals:
-            new_state = vals.get('state')
-            current_user = self.env.user
-            
-            _logger.info("State change requested to: %s", new_state)
-
-            for leave in self:
-                _logger.info("Processing leave %s (current state: %s)", leave.id, leave.state)
-                
-                if new_state == 'validate1':
-                    if current_user != leave.first_approver_id:
-                        _logger.error("Unauthorized state change to validate1 by %s", current_user.name)
-                        raise UserError("Only the first approver can move this request to second approval.")
-
-                if new_state == 'validate':
-                    # Case 1: Second approvers exist
-                    if leave.second_approver_ids:
-                        if current_user == leave.first_approver_id:
-                            _logger.error("First approver cannot finalize when second approvers exist")
-                            raise UserError("The first approver cannot approve at the second stage.")
-                        if current_user not in leave.second_approver_ids:
-                            _logger.error("Unauthorized final approval by %s", current_user.name)
-                            raise UserError("Only designated second approvers can approve this request.")
-                    # Case 2: No second approvers exist
-                    else:
-                        if current_user != leave.first_approver_id:
-                            _logger.error("Only first approver can finalize when no second approvers")
-                            raise UserError("Only the first approver can finalize this request.")
-
-        result = super(HrLeave, self).write(vals)
-        
-        # Send approved notification after successful state change to 'validate'
-        if 'state' in vals and vals.get('state') == 'validate':
-            for leave in self:
-                if leave.state == 'validate':  # Double-check the state was actually changed
-                    _logger.info("Leave %s approved, sending notification to employee", leave.id)
-                    try:
-                        leave._send_leave_approved_notification()
-                    except Exception as e:
-                        _logger.error("Failed to send approved notification for leave %s: %s", leave.id, str(e))
-                        _logger.exception("Full exception details:")
-        
-        _logger.info("Write method completed successfully")
+        if 'state' not in vals:
+            result = super(HrLeave, self).write(vals)
+            if APPROVER_FIELDS.intersection(vals):
+                # new approvers, set directly or recomputed from the new employee
+                self._sync_approver_inbox()
+            return result
+
+        new_state = vals['state']
+        with approval_stage(self.env, 'write.state', state=new_state, records=len(self)):
+            if new_state in ('validate1', 'validate'):
+                self._check_state_write(new_state)
+
+            stamp_groups = self.filtered(lambda l: l.state != new_state)._get_stage_stamp_groups(new_state)
+            if len(stamp_groups) == 1 and next(iter(stamp_groups.values())) == self:
+                # the usual case: every leave gets the same stamp, in the same UPDATE
+                vals = {**vals, **self._get_stage_stamp_values(next(iter(stamp_groups)))}
+                stamp_groups = {}
+            result = super(HrLeave, self).write(vals)
+            for state, leaves in stamp_groups.items():
+                super(HrLeave, leaves).write(leaves._get_stage_stamp_values(state))
+
+            if APPROVER_FIELDS.intersection(vals):
+                self._sync_approver_inbox()
+            elif self.ids:
+                self.env['hr.leave.approver.inbox']._update_state(self.ids, new_state)
+
+        # Queue the approved notification in the same transaction as the state
+        # change: if the outbox row cannot be written, the approval fails with it
+        if new_state == 'validate':
+            approved = self.filtered(lambda l: l.state == 'validate')  # Double-check the state was actually changed
+            approved._send_leave_approved_notification()
+
         return result
 
+    def _get_stage_stamp_groups(self, new_state):
+        """Map each stamped stage to the leaves moving to ``new_state`` it applies to"""
+        if not self or new_state not in STAGE_STAMP_FIELDS:
+            return {}
+        leaves_by_state = {new_state: self}
+        if new_state == 'validate':
+            # validated in a single step: that decision is the first approval
+            direct = self.filtered(lambda l: not l.first_approved_at)
+            leaves_by_state = {'validate1': direct, 'validate': self - direct}
+        return {state: leaves for state, leaves in leaves_by_state.items() if leaves}
+
+    def _get_stage_stamp_values(self, state):
+        """Values recording when and by whom the leaves reached ``state``"""
+        at_field, by_field = STAGE_STAMP_FIELDS[state]
+        return {at_field: fields.Datetime.now(), by_field: self.env.uid}
+
+    def _check_state_write(self, new_state):
+        """Raise if the current user may not move these leaves to ``new_state``"""
+        current_user = self.env.user
+        # Load both approver fields for the whole recordset at once
+        self.fetch(['first_approver_id', 'second_approver_ids'])
+
+        if new_state == 'validate1':
+            errors = dict.fromkeys(
+                self.filtered(lambda l: l.first_approver_id != current_user).ids,
+                "Only the first approver can move this request to second approval.",
+            )
+        else:
+            with_second = self.filtered('second_approver_ids')
+            # Case 1: Second approvers exist
+            first_approver = with_second.filtered(lambda l: l.first_approver_id == current_user)
+            not_second_approver = with_second.filtered(lambda l: current_user not in l.second_approver_ids) - first_approver
+            # Case 2: No second approvers exist
+            not_finalizer = (self - with_second).filtered(lambda l: l.first_approver_id != current_user)
+
+            errors = dict.fromkeys(first_approver.ids, "The first approver cannot approve at the second stage.")
+            errors.update(dict.fromkeys(not_second_approver.ids, "Only designated second approvers can approve this request."))
+            errors.update(dict.fromkeys(not_finalizer.ids, "Only the first approver can finalize this request."))
+
+        for leave in self:
+            if leave.id in errors:
+                _logger.warning("Unauthorized state change of leave %s to %s by user %s", leave.id, new_state, current_user.id)
+                raise UserError(errors[leave.id])
+
     @api.model
     def debug_template_processing(self, leave_id):
         """Debug method to test template variable processing"""
@@ -446,15 +453,6 @@ class HrLeave(models.Model):
             _logger.info("Action: %s, Active: %s, Trigger: %s", 
                        action.name, action.active, action.trigger)
 
-    def _generate_approval_token(self):
-        self.approval_token = secrets.token_urlsafe(16)
-        return self.approval_token
-
-    def create(self, vals):
-        record = super().create(vals)
-        record._generate_approval_token()
-        return record
-
     @api.model
     def debug_leave_approval_flow(self, leave_id):
         """Debug method to test the entire approval flow"""
@@ -468,7 +466,11 @@ class HrLeave(models.Model):
             'second_approvers': [a.name for a in leave.second_approver_ids],
             'employee': leave.employee_id.name,
             'employee_email': leave.employee_id.work_email,
-            'templates': {}
+            'templates': {},
+            'notifications': self.env['hr.leave.notification'].sudo().search_read(
+                [('leave_id', '=', leave.id)],
+                ['stage', 'email_to', 'state', 'attempt_count', 'latency_ms', 'next_retry_at', 'failure_reason'],
+            ),
         }
         
         # Check all required templates exist
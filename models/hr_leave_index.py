@@ -0,0 +1,67 @@
+from odoo import models, api, tools
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# (index name, table, expressions, where) matched to the approval workflow queries
+APPROVAL_INDEXES = [
+    # 'To Approve (1st level)' lookups and approval checks
+    ('hr_leave_first_approver_state_idx', 'hr_leave', ['first_approver_id', 'state'], ''),
+    # second approver -> leaves; PostgreSQL's default name, usually created with the table
+    ('hr_leave_second_approver_rel_user_id_leave_id_idx', 'hr_leave_second_approver_rel', ['user_id', 'leave_id'], ''),
+    # dashboard order and cursor pagination
+    ('hr_leave_create_date_id_idx', 'hr_leave', ['create_date DESC', 'id DESC'], ''),
+]
+
+# Indexes declared elsewhere in the module, included in the report
+DECLARED_INDEXES = [
+    ('hr_leave_approval_token_token_hash_uniq', 'hr_leave_approval_token'),
+    ('hr_leave__approver_search_text_index', 'hr_leave'),
+    ('hr_leave_approver_inbox_user_state_idx', 'hr_leave_approver_inbox'),
+    ('hr_leave_notification_retry_idx', 'hr_leave_notification'),
+    ('hr_leave_notification_create_date_idx', 'hr_leave_notification'),
+]
+
+
+class HrLeave(models.Model):
+    _inherit = 'hr.leave'
+
+    def init(self):
+        super().init()
+        for name, table, expressions, where in APPROVAL_INDEXES:
+            tools.create_index(self._cr, name, table, expressions, where=where)
+        if not self.pool.has_trigram:
+            _logger.warning(
+                "pg_trgm is not installed: the approver dashboard search scans "
+                "hr_leave.approver_search_text sequentially; run CREATE EXTENSION pg_trgm "
+                "and update the module to index it."
+            )
+
+    @api.model
+    def _check_approval_indexes(self):
+        """Report approval indexes that are missing or have never been scanned.
+
+        Returns a list of ``{'name', 'table', 'status', 'scans'}`` dicts, with
+        status ``ok``, ``missing`` or ``unused``, and logs a warning for each
+        index that is not ``ok``.
+        """
+        expected = [(name, table) for name, table, _expressions, _where in APPROVAL_INDEXES] + DECLARED_INDEXES
+        self._cr.execute("""
+            SELECT indexrelname, idx_scan
+              FROM pg_stat_user_indexes
+             WHERE indexrelname IN %s
+        """, [tuple(name for name, _table in expected)])
+        scans = dict(self._cr.fetchall())
+
+        report = []
+        for name, table in expected:
+            if name not in scans:
+                status = 'missing'
+            elif not scans[name]:
+                status = 'unused'
+            else:
+                status = 'ok'
+            if status != 'ok':
+                _logger.warning("Approval index %s on %s is %s", name, table, status)
+            report.append({'name': name, 'table': table, 'status': status, 'scans': scans.get(name, 0)})
+        return report
@@ -0,0 +1,283 @@
+from odoo import models, fields, api, tools
+from ..tools.instrumentation import approval_stage
+from .hr_leave_approver_inbox import PENDING_DECISION_DOMAIN
+from collections import defaultdict
+from datetime import timedelta
+from urllib.parse import urlencode
+import logging
+import threading
+
+_logger = logging.getLogger(__name__)
+
+DIGEST_TEMPLATE = 'leave_approver.email_approval_digest'
+
+STAGE_TEMPLATES = {
+    'first_approval': 'leave_approver.email_template_first_approval',
+    'second_approval': 'leave_approver.email_template_second_approval',
+    'approved': 'leave_approver.email_template_leave_approved',
+}
+
+# Failed deliveries are retried after 5, 10, 20 and 40 minutes, then given up
+MAX_ATTEMPTS = 5
+RETRY_BASE_MINUTES = 5
+
+
+class HrLeaveNotification(models.Model):
+    """Outbox and delivery ledger of approval emails.
+
+    Rows are written in the same transaction as the state change that
+    produced them and only turned into emails by the dispatcher cron once
+    that transaction has committed, so SMTP never runs while the leave is
+    locked and a rollback never leaves a sent email behind.
+
+    Each row then keeps the outcome of its delivery: attempts, latency from
+    queueing to sending, and when a failed delivery is retried next.
+    """
+    _name = 'hr.leave.notification'
+    _description = 'Leave Approval Notification'
+    _order = 'id'
+
+    leave_id = fields.Many2one('hr.leave', string="Leave", required=True, ondelete='cascade', index=True)
+    stage = fields.Selection([
+        ('first_approval', 'First Approval'),
+        ('second_approval', 'Second Approval'),
+        ('approved', 'Approved'),
+    ], string="Stage", required=True)
+    email_to = fields.Char(string="Email To")
+    partner_ids = fields.Many2many('res.partner', string="Recipients")
+    recipient_user_id = fields.Many2one('res.users', string="Recipient User")
+    lang = fields.Char(string="Language")
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ], string="Status", default='pending', required=True, index=True)
+    mail_id = fields.Integer(string="Mail ID", readonly=True)
+    failure_reason = fields.Text(string="Failure Reason", readonly=True)
+    attempt_count = fields.Integer(string="Attempts", readonly=True)
+    last_attempt_at = fields.Datetime(string="Last Attempt", readonly=True)
+    next_retry_at = fields.Datetime(string="Next Retry", readonly=True,
+                                    help="Empty on a failed delivery once all attempts are spent")
+    sent_at = fields.Datetime(string="Sent On", readonly=True)
+    latency_ms = fields.Integer(string="Latency (ms)", readonly=True, group_operator='avg',
+                                help="Time from queueing to delivery")
+
+    def init(self):
+        # retry scan of the failed deliveries, and delivery health by period
+        tools.create_index(self._cr, 'hr_leave_notification_retry_idx', self._table,
+                           ['next_retry_at'], where="state = 'failed'")
+        tools.create_index(self._cr, 'hr_leave_notification_create_date_idx', self._table,
+                           ['create_date'])
+
+    @api.model
+    def _enqueue(self, vals_list):
+        """Queue notifications and wake the dispatcher once the transaction commits."""
+        notifications = self.sudo().create(vals_list)
+        if notifications:
+            self.env.ref('leave_approver.ir_cron_dispatch_leave_notifications')._trigger()
+        return notifications
+
+    @api.model
+    def _cron_dispatch(self, batch_size=100):
+        """Send pending notifications by batches of ``batch_size``, committing after each batch.
+
+        A batch is sent over one SMTP connection per mail server, so
+        ``batch_size`` also bounds how many messages share a session.
+        """
+        notifications = self.search([('state', '=', 'pending')], limit=batch_size)
+        notifications._send()
+        if not getattr(threading.current_thread(), 'testing', False):
+            self.env.cr.commit()
+
+        if len(notifications) == batch_size:
+            self.env.ref('leave_approver.ir_cron_dispatch_leave_notifications')._trigger()
+
+    @api.model
+    def _cron_retry(self, batch_size=100):
+        """Retry the failed deliveries that are due, oldest due first."""
+        notifications = self.search([
+            ('state', '=', 'failed'),
+            ('next_retry_at', '<=', fields.Datetime.now()),
+        ], order='next_retry_at', limit=batch_size)
+        # the failed messages are replaced by freshly rendered ones
+        self.env['mail.mail'].sudo().browse(
+            [mail_id for mail_id in notifications.mapped('mail_id') if mail_id]
+        ).exists().filtered(lambda mail: mail.state == 'exception').unlink()
+        notifications._send()
+        if not getattr(threading.current_thread(), 'testing', False):
+            self.env.cr.commit()
+
+        if len(notifications) == batch_size:
+            self.env.ref('leave_approver.ir_cron_retry_leave_notifications')._trigger()
+
+    @api.model
+    def _get_delivery_health(self, days=7):
+        """Notifications of the last ``days`` days per stage and status.
+
+        Returns ``{(stage, state): {'count', 'avg_latency_ms', 'max_attempts'}}``.
+        """
+        since = fields.Datetime.now() - timedelta(days=days)
+        groups = self.sudo()._read_group(
+            [('create_date', '>=', since)], ['stage', 'state'],
+            ['__count', 'latency_ms:avg', 'attempt_count:max'],
+        )
+        return {
+            (stage, state): {'count': count, 'avg_latency_ms': latency, 'max_attempts': attempts}
+            for stage, state, count, latency, attempts in groups
+        }
+
+    @api.model
+    def _cron_send_digests(self):
+        """Send each digest-mode approver one summary of the leaves waiting for them.
+
+        Pending work of all digest approvers is read with a single grouped
+        query on the approver inbox; the mails are left to the mail queue.
+        """
+        Inbox = self.env['hr.leave.approver.inbox'].sudo()
+        groups = Inbox._read_group(
+            [('user_id.leave_notification_mode', '=', 'digest')] + PENDING_DECISION_DOMAIN,
+            ['user_id', 'stage'],
+            ['leave_id:array_agg'],
+        )
+        pending = defaultdict(dict)
+        for user, stage, leave_ids in groups:
+            pending[user][stage] = leave_ids
+        if not pending:
+            return
+
+        # one prefetch for every leave listed in any digest
+        all_leaves = self.env['hr.leave'].sudo().browse(
+            {leave_id for stages in pending.values() for ids in stages.values() for leave_id in ids})
+        sender_values = self._get_digest_sender_values(all_leaves[:1])
+
+        mail_values_list = []
+        for user, stages in pending.items():
+            if not user.email:
+                _logger.warning("Digest approver %s has no email, skipping", user.id)
+                continue
+            first_leaves = all_leaves.browse(stages.get('first', [])).with_prefetch(all_leaves._ids).sorted('create_date')
+            second_leaves = all_leaves.browse(stages.get('second', [])).with_prefetch(all_leaves._ids).sorted('create_date')
+            token = self.env['hr.leave.approval.token']._issue((first_leaves | second_leaves)[:1], user)
+            with approval_stage(self.env, 'dispatch.digest', user_id=user.id,
+                                records=len(first_leaves) + len(second_leaves)):
+                body = self.env['ir.qweb'].with_context(lang=user.lang or 'en_US')._render(DIGEST_TEMPLATE, {
+                    'user': user,
+                    'first_leaves': first_leaves,
+                    'second_leaves': second_leaves,
+                    'dashboard_url': '/leave/view_requests?' + urlencode({'token': token, 'approver_id': user.id}),
+                })
+            mail_values_list.append({
+                'subject': "%s leave requests waiting for your approval" % (len(first_leaves) + len(second_leaves)),
+                'body_html': self.env['mail.render.mixin']._replace_local_links(body),
+                'email_to': user.email,
+                'auto_delete': True,
+                **sender_values,
+            })
+
+        if mail_values_list:
+            self.env['mail.mail'].sudo().create(mail_values_list)
+            self.env.ref('mail.ir_cron_mail_scheduler_action')._trigger()
+
+    @api.model
+    def _get_digest_sender_values(self, leave):
+        """Sender of the digests: the one of the first approval emails, rendered"""
+        template = self.env.ref(STAGE_TEMPLATES['first_approval'], raise_if_not_found=False)
+        values = {'email_from': False, 'reply_to': False, 'mail_server_id': False}
+        if template and leave:
+            values.update({
+                'email_from': template._render_field('email_from', leave.ids)[leave.id],
+                'reply_to': template._render_field('reply_to', leave.ids)[leave.id],
+                'mail_server_id': template.mail_server_id.id,
+            })
+        if not values['email_from']:
+            values['email_from'] = self.env.company.email_formatted
+        return values
+
+    def _send(self):
+        """Render the notifications into mails, then send them all at once.
+
+        mail.mail.send() opens one SMTP connection per mail server for the
+        whole batch instead of one per message. A notification that fails to
+        render, or whose message is rejected, is marked failed on its own.
+        """
+        mails = self.env['mail.mail'].sudo()
+        mail_by_notification = {}
+        for notification in self:
+            try:
+                with approval_stage(self.env, 'dispatch.render', stage_name=notification.stage,
+                                    leave_id=notification.leave_id.id), self.env.cr.savepoint():
+                    mail_by_notification[notification] = notification._create_mail()
+            except Exception as e:
+                _logger.warning("Failed preparing %s email for leave %s: %s",
+                                notification.stage, notification.leave_id.id, e)
+                notification._record_attempt(error=str(e))
+        if not mail_by_notification:
+            return
+
+        mails = mails.concat(*mail_by_notification.values())
+        with approval_stage(self.env, 'dispatch.send', records=len(mails)):
+            mails.send(raise_exception=False)
+
+        # sent mails may already be deleted (auto_delete)
+        failed_mails = mails.exists().filtered(lambda mail: mail.state == 'exception')
+        for notification, mail in mail_by_notification.items():
+            if mail in failed_mails:
+                _logger.warning("Failed sending %s email for leave %s: %s",
+                                notification.stage, notification.leave_id.id, mail.failure_reason)
+                notification._record_attempt(mail, error=mail.failure_reason or "Unknown delivery error")
+            else:
+                notification._record_attempt(mail)
+
+    def _record_attempt(self, mail=None, error=None):
+        """Write the outcome of a delivery attempt, scheduling a retry on failure"""
+        self.ensure_one()
+        now = fields.Datetime.now()
+        attempts = self.attempt_count + 1
+        vals = {
+            'attempt_count': attempts,
+            'last_attempt_at': now,
+            'mail_id': mail.id if mail else self.mail_id,
+        }
+        if error:
+            vals.update({
+                'state': 'failed',
+                'failure_reason': error,
+                'next_retry_at': (now + timedelta(minutes=RETRY_BASE_MINUTES * 2 ** (attempts - 1))
+                                  if attempts < MAX_ATTEMPTS else False),
+            })
+        else:
+            vals.update({
+                'state': 'sent',
+                'failure_reason': False,
+                'next_retry_at': False,
+                'sent_at': now,
+                'latency_ms': int((now - self.create_date).total_seconds() * 1000),
+            })
+        self.write(vals)
+
+    def _create_mail(self):
+        """Create the (outgoing) mail.mail of this notification"""
+        self.ensure_one()
+        template = self.env.ref(STAGE_TEMPLATES[self.stage], raise_if_not_found=False)
+        if not template:
+            raise ValueError("Email template %s not found" % STAGE_TEMPLATES[self.stage])
+
+        template_ctx = {
+            'lang': self.lang or 'en_US',
+            'force_email': True,
+        }
+        if self.recipient_user_id:
+            template_ctx['recipient_user'] = self.recipient_user_id
+            if self.stage != 'approved':
+                # personal dashboard link, only the hash is stored
+                template_ctx['approval_token'] = self.env['hr.leave.approval.token']._issue(
+                    self.leave_id, self.recipient_user_id)
+
+        mail_values = template.with_context(**template_ctx)._render_leave_mail_values(self.leave_id)
+        # one or the other: mail.mail sends email_to and each recipient
+        # partner as separate messages
+        if self.email_to:
+            mail_values['email_to'] = self.email_to
+        else:
+            mail_values['recipient_ids'] = [(4, partner.id) for partner in self.partner_ids]
+        return self.env['mail.mail'].sudo().create(mail_values)
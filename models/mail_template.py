@@ -0,0 +1,88 @@
+from odoo import models
+from odoo.tools import safe_eval
+from collections import OrderedDict
+from lxml import html
+from markupsafe import Markup
+import threading
+
+# (dbname, template id, lang, write_date) -> compiled QWeb functions of the
+# translated body_html, least recently used first. ir.qweb only caches the
+# templates it loads by view reference; a body given as an element is parsed,
+# turned into Python code and compiled again on every _render, so the
+# compiled functions are kept here and called directly.
+_BODY_CACHE = OrderedDict()
+_BODY_CACHE_SIZE = 256
+_BODY_CACHE_LOCK = threading.Lock()
+
+
+class MailTemplate(models.Model):
+    _inherit = 'mail.template'
+
+    def write(self, vals):
+        result = super().write(vals)
+        self._clear_body_cache()
+        return result
+
+    def unlink(self):
+        self._clear_body_cache()
+        return super().unlink()
+
+    def _clear_body_cache(self):
+        dbname = self.env.cr.dbname
+        with _BODY_CACHE_LOCK:
+            for key in list(_BODY_CACHE):
+                if key[0] == dbname and key[1] in self.ids:
+                    del _BODY_CACHE[key]
+
+    def _get_compiled_body(self):
+        """Return ``(template_functions, def_name)`` of this template's
+        body_html in the context language, as ``ir.qweb._compile`` does"""
+        self.ensure_one()
+        lang = self.env.context.get('lang') or 'en_US'
+        # write_date keeps other workers from serving a body edited elsewhere
+        key = (self.env.cr.dbname, self.id, lang, self.write_date)
+        with _BODY_CACHE_LOCK:
+            compiled = _BODY_CACHE.get(key)
+            if compiled is not None:
+                _BODY_CACHE.move_to_end(key)
+                return compiled
+
+        element = html.fragment_fromstring(self.body_html or '', create_parent='div')
+        compiled = self.env['ir.qweb']._compile(element)
+        with _BODY_CACHE_LOCK:
+            _BODY_CACHE[key] = compiled
+            while len(_BODY_CACHE) > _BODY_CACHE_SIZE:
+                _BODY_CACHE.popitem(last=False)
+        return compiled
+
+    def _render_leave_mail_values(self, leave):
+        """Render this template for ``leave`` into mail.mail values.
+
+        Same output as ``send_mail`` for the approval templates, with the
+        body rendered by the compiled functions cached per language. The
+        context (``lang``, ``recipient_user``, ``approval_token``...) is
+        exposed as ``ctx``.
+        """
+        self.ensure_one()
+        variables = self._render_eval_context()
+        variables['object'] = leave
+        # what ir.qweb._render does, minus the compilation
+        template_functions, def_name = self._get_compiled_body()
+        safe_eval.check_values(variables)
+        qweb = self.env['ir.qweb']._prepare_environment(variables)
+        body = Markup(''.join(template_functions[def_name](qweb, variables)))
+        # drop the <div> wrapping the fragment
+        body = self.env['mail.render.mixin']._replace_local_links(body[5:-6])
+
+        values = {
+            field: self._render_field(field, leave.ids)[leave.id]
+            for field in ('subject', 'email_from', 'reply_to')
+        }
+        values.update({
+            'body_html': body,
+            'model': leave._name,
+            'res_id': leave.id,
+            'auto_delete': self.auto_delete,
+            'mail_server_id': self.mail_server_id.id,
+        })
+        return values
@@ -0,0 +1,23 @@
+from odoo import models, fields
+
+NOTIFICATION_MODES = [
+    ('instant', 'Every Request'),
+    ('digest', 'Digest'),
+]
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    leave_notification_mode = fields.Selection(
+        NOTIFICATION_MODES, string="Leave Approval Emails", default='instant', required=True,
+        help="Digest: instead of one email per leave to approve, receive a periodic "
+             "summary of all the leaves waiting for your approval.")
+
+    @property
+    def SELF_READABLE_FIELDS(self):
+        return super().SELF_READABLE_FIELDS + ['leave_notification_mode']
+
+    @property
+    def SELF_WRITEABLE_FIELDS(self):
+        return super().SELF_WRITEABLE_FIELDS + ['leave_notification_mode']
@@ -0,0 +1,3 @@
+from . import test_record_rule_benchmark
+from . import test_query_budgets
+from . import test_approver_sync
\ No newline at end of file
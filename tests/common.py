@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+
+from odoo.tests.common import TransactionCase
+
+# States synthetic leaves are spread over, bypassing the approval rules
+SYNTHETIC_STATES = ['confirm', 'validate1', 'validate', 'refuse']
+
+
+class LeaveApproverSyntheticOrgCase(TransactionCase):
+    """Synthetic organisation for benchmarks and query-count budgets.
+
+    Each department gets a manager (first approver of its employees) and
+    ``OFFICERS_PER_DEPARTMENT`` HR officers (second approvers); every
+    employee has a user and ``LEAVES_PER_EMPLOYEE`` one-day leaves spread
+    over the approval states. Subclasses scale it through the class
+    attributes.
+    """
+
+    EMPLOYEE_COUNT = 100
+    DEPARTMENT_COUNT = 5
+    OFFICERS_PER_DEPARTMENT = 3
+    LEAVES_PER_EMPLOYEE = 4
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(
+            cls.env.context,
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_notrack=True,
+            no_reset_password=True,
+        ))
+        cls._generate_org()
+
+    @classmethod
+    def _generate_org(cls):
+        group_user = cls.env.ref('base.group_user')
+        users = cls.env['res.users'].create([{
+            'name': f"Synthetic User {index}",
+            'login': f"synthetic_user_{index}",
+            'email': f"synthetic_user_{index}@example.com",
+            'groups_id': [(6, 0, group_user.ids)],
+        } for index in range(cls.EMPLOYEE_COUNT)])
+        cls.departments = cls.env['hr.department'].create([
+            {'name': f"Synthetic Department {index}"} for index in range(cls.DEPARTMENT_COUNT)
+        ])
+
+        # The first users of each department are its manager and HR officers
+        per_department = cls.EMPLOYEE_COUNT // cls.DEPARTMENT_COUNT
+        cls.managers = users.browse()
+        cls.officers = users.browse()
+        employee_vals = []
+        for index, department in enumerate(cls.departments):
+            department_users = users[index * per_department:(index + 1) * per_department]
+            if index == len(cls.departments) - 1:
+                department_users = users[index * per_department:]
+            manager = department_users[0]
+            officers = department_users[1:1 + cls.OFFICERS_PER_DEPARTMENT]
+            cls.managers |= manager
+            cls.officers |= officers
+            employee_vals += [{
+                'name': user.name,
+                'user_id': user.id,
+                'work_email': user.email,
+                'department_id': department.id,
+                'leave_manager_id': manager.id,
+                'hr_officer_ids': [(6, 0, officers.ids)],
+            } for user in department_users]
+        cls.employees = cls.env['hr.employee'].create(employee_vals)
+        # HR officers validate the second step of 'both' leaves
+        cls.officers.write({'groups_id': [(4, cls.env.ref('hr_holidays.group_hr_holidays_user').id)]})
+
+        cls.leave_type = cls.env['hr.leave.type'].create({
+            'name': "Synthetic Time Off",
+            'requires_allocation': 'no',
+            'leave_validation_type': 'both',
+        })
+        # One leave per week, on Mondays, so no two leaves of an employee overlap
+        first_monday = date(2020, 1, 6)
+        cls.leaves = cls.env['hr.leave'].create([{
+            'name': f"Synthetic leave {week}",
+            'employee_id': employee.id,
+            'holiday_status_id': cls.leave_type.id,
+            'request_date_from': first_monday + timedelta(weeks=week),
+            'request_date_to': first_monday + timedelta(weeks=week),
+        } for employee in cls.employees for week in range(cls.LEAVES_PER_EMPLOYEE)])
+
+        cls.env.cr.execute(
+            "UPDATE hr_leave SET state = (%s::varchar[])[1 + id %% %s] WHERE id IN %s",
+            [SYNTHETIC_STATES, len(SYNTHETIC_STATES), tuple(cls.leaves.ids)],
+        )
+        cls.env.invalidate_all()
+        cls.env['hr.leave.approver.inbox']._refresh(cls.leaves.ids)
@@ -0,0 +1,40 @@
+from odoo.tests import tagged
+
+from .common import LeaveApproverSyntheticOrgCase
+from ..models.hr_leave_custom import PENDING_STATES
+
+
+@tagged('post_install', '-at_install')
+class TestApproverSync(LeaveApproverSyntheticOrgCase):
+    """Open leaves follow their employee's approvers, closed ones keep theirs"""
+
+    EMPLOYEE_COUNT = 20
+    DEPARTMENT_COUNT = 2
+    OFFICERS_PER_DEPARTMENT = 2
+
+    def test_parent_change_updates_open_leaves(self):
+        old_manager, new_manager = self.managers[0], self.managers[1]
+        manager_employees = {employee.user_id: employee for employee in self.employees}
+        employee = self.employees.filtered(
+            lambda e: e.leave_manager_id == old_manager and e.user_id not in self.managers | self.officers
+        )[0]
+        # hr_holidays only follows the parent when the leave manager was the parent's user
+        employee.parent_id = manager_employees[old_manager]
+        self.assertEqual(employee.leave_manager_id, old_manager)
+
+        employee.parent_id = manager_employees[new_manager]
+        self.assertEqual(employee.leave_manager_id, new_manager)
+
+        leaves = self.leaves.filtered(lambda l: l.employee_id == employee)
+        open_leaves = leaves.filtered(lambda l: l.state in PENDING_STATES)
+        self.assertTrue(open_leaves)
+        self.assertEqual(open_leaves.first_approver_id, new_manager)
+        self.assertEqual((leaves - open_leaves).first_approver_id, old_manager)
+
+        inbox = self.env['hr.leave.approver.inbox'].search([
+            ('leave_id', 'in', leaves.ids), ('stage', '=', 'first'),
+        ])
+        self.assertEqual(
+            {(row.leave_id, row.user_id) for row in inbox},
+            {(leave, leave.first_approver_id) for leave in leaves},
+        )
@@ -0,0 +1,198 @@
+from datetime import date, timedelta
+import logging
+import time
+
+from odoo.tests import HttpCase, tagged
+
+from .common import LeaveApproverSyntheticOrgCase
+
+_logger = logging.getLogger(__name__)
+
+# Most extra queries a hot path may run when its batch doubles: anything
+# done per record makes the larger batch blow it
+MAX_QUERY_GROWTH = 3
+
+
+class QueryBudgetMixin:
+
+    def _measure(self, operation):
+        """Return (queries, seconds) spent by ``operation``, flush included"""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        start_count = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        operation()
+        self.env.flush_all()
+        return self.env.cr.sql_log_count - start_count, time.perf_counter() - start
+
+    def _assert_growth(self, path, records, operation):
+        """Run ``operation`` on a batch of ``records`` then on a batch twice as
+        large, and check the second one does not run more than
+        ``MAX_QUERY_GROWTH`` additional queries"""
+        size = len(records) // 3
+        self.assertGreater(size, 0, "%s: not enough records to compare batches" % path)
+        small, large = records[:size], records[size:3 * size]
+
+        small_count, small_duration = self._measure(lambda: operation(small))
+        large_count, large_duration = self._measure(lambda: operation(large))
+        _logger.info(
+            "query budget %s: %s queries / %.2f ms on %s records, %s queries / %.2f ms on %s records",
+            path, small_count, small_duration * 1000, len(small),
+            large_count, large_duration * 1000, len(large),
+        )
+        self.assertLessEqual(
+            large_count - small_count, MAX_QUERY_GROWTH,
+            "%s: %s queries on %s records but %s on %s, something runs per record"
+            % (path, small_count, len(small), large_count, len(large)),
+        )
+
+
+@tagged('post_install', '-at_install')
+class TestQueryBudgets(QueryBudgetMixin, LeaveApproverSyntheticOrgCase):
+    """Query growth of the approval hot paths between a batch and one twice as large.
+
+    hr_holidays' per-leave followers and activities are switched off, so
+    the counts only cover what this module does.
+    """
+
+    BATCH_SIZE = 20
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(
+            cls.env.context,
+            leave_fast_create=True,
+            mail_activity_automation_skip=True,
+        ))
+        cls.leaves = cls.leaves.with_env(cls.env)
+        cls.employees = cls.employees.with_env(cls.env)
+
+    def _pending_leaves(self, manager, state):
+        return self.leaves.filtered(lambda l: l.first_approver_id == manager and l.state == state)
+
+    def test_create(self):
+        # a week after the synthetic leaves, so nothing overlaps
+        monday = date(2020, 1, 6) + timedelta(weeks=self.LEAVES_PER_EMPLOYEE)
+        employees = self.employees[:3 * (self.BATCH_SIZE // 2)]
+        self._assert_growth('create', employees, lambda employees: self.env['hr.leave'].create([{
+            'name': "Budget leave",
+            'employee_id': employee.id,
+            'holiday_status_id': self.leave_type.id,
+            'request_date_from': monday,
+            'request_date_to': monday,
+        } for employee in employees]))
+
+    def test_compute_approvers(self):
+        # changing the manager recomputes the approvers of the open leaves
+        new_manager = self.officers[-1]
+        department_employees = self.employees.filtered(lambda e: e.department_id == self.departments[0])
+        self._assert_growth('compute_approvers', department_employees,
+                            lambda employees: employees.write({'leave_manager_id': new_manager.id}))
+
+    def test_action_confirm(self):
+        refused = self.leaves.filtered(lambda l: l.state == 'refuse')[:3 * (self.BATCH_SIZE // 2)]
+        self.env.cr.execute("UPDATE hr_leave SET state = 'draft' WHERE id IN %s", [tuple(refused.ids)])
+        self.env['hr.leave.approver.inbox']._update_state(refused.ids, 'draft')
+        self.env.invalidate_all()
+
+        self._assert_growth('action_confirm', refused, lambda leaves: leaves.action_confirm())
+        self.assertEqual(set(refused[:3 * (len(refused) // 3)].mapped('state')), {'confirm'})
+
+    def test_action_approve(self):
+        manager = self.managers[0]
+        to_approve = self._pending_leaves(manager, 'confirm').with_user(manager)
+        self._assert_growth('action_approve', to_approve, lambda leaves: leaves.action_approve())
+        self.assertEqual(set(to_approve[:3 * (len(to_approve) // 3)].mapped('state')), {'validate1'})
+
+    def test_action_approve_second(self):
+        to_approve = self._pending_leaves(self.managers[0], 'validate1')
+        officer = to_approve.second_approver_ids[:1]
+        to_approve = to_approve.with_user(officer)
+        self._assert_growth('action_approve_second', to_approve, lambda leaves: leaves.action_approve())
+        self.assertEqual(set(to_approve[:3 * (len(to_approve) // 3)].mapped('state')), {'validate'})
+
+    def test_write(self):
+        manager = self.managers[0]
+        leaves = self._pending_leaves(manager, 'confirm')
+        self._assert_growth('write', leaves, lambda leaves: leaves.write({'private_name': "Budget"}))
+        self._assert_growth('write_state', leaves.with_user(manager),
+                            lambda leaves: leaves.write({'state': 'validate1'}))
+
+
+@tagged('post_install', '-at_install')
+class TestDashboardQueryBudget(QueryBudgetMixin, HttpCase, LeaveApproverSyntheticOrgCase):
+    """The approver dashboard, as served over HTTP, runs the same queries
+    when the approver's inbox doubles, and fewer when not modified"""
+
+    def _dashboard_url(self, approver):
+        leave = self.env['hr.leave.approver.inbox'].search([('user_id', '=', approver.id)], limit=1).leave_id
+        self.assertTrue(leave, "approver %s has no leave in their inbox" % approver.name)
+        token = self.env['hr.leave.approval.token']._issue(leave, approver)
+        return '/leave/view_requests?token=%s&approver_id=%s' % (token, approver.id)
+
+    def _measure_page(self, name, url, headers=None):
+        responses = []
+        count, duration = self._measure(lambda: responses.append(self.url_open(url, headers=headers)))
+        _logger.info("query budget view_all_requests (%s): %s queries, %.2f ms", name, count, duration * 1000)
+        return count, responses[0]
+
+    def test_view_all_requests(self):
+        manager = self.managers[0]
+        url = self._dashboard_url(manager)
+        # compile the templates and warm the registry caches outside of the counts
+        self.url_open(url)
+
+        Inbox = self.env['hr.leave.approver.inbox']
+        inbox_size = Inbox.search_count([('user_id', '=', manager.id)])
+        small_count, response = self._measure_page('%s leaves' % inbox_size, url)
+        self.assertEqual(response.status_code, 200)
+
+        # as many leaves again for the manager's team, a week after the synthetic ones
+        first_monday = date(2020, 1, 6)
+        team = self.employees.filtered(lambda e: e.leave_manager_id == manager)
+        self.env['hr.leave'].with_context(
+            leave_fast_create=True,
+            mail_activity_automation_skip=True,
+        ).create([{
+            'name': f"Budget leave {week}",
+            'employee_id': employee.id,
+            'holiday_status_id': self.leave_type.id,
+            'request_date_from': first_monday + timedelta(weeks=week),
+            'request_date_to': first_monday + timedelta(weeks=week),
+        } for employee in team for week in range(self.LEAVES_PER_EMPLOYEE, 2 * self.LEAVES_PER_EMPLOYEE)])
+        larger_size = Inbox.search_count([('user_id', '=', manager.id)])
+        self.assertGreaterEqual(larger_size, 2 * inbox_size)
+
+        large_count, response = self._measure_page('%s leaves' % larger_size, url)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(
+            large_count - small_count, MAX_QUERY_GROWTH,
+            "dashboard: %s queries for %s leaves but %s for %s, something runs per leave"
+            % (small_count, inbox_size, large_count, larger_size),
+        )
+
+        not_modified_count, response = self._measure_page(
+            'not modified', url, headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertLess(not_modified_count, large_count)
+
+
+@tagged('post_install', '-at_install', '-standard', 'leave_approver_benchmark')
+class TestQueryBudgetsAtScale(TestQueryBudgets):
+    """The same checks on a large organisation, with the durations logged.
+
+    Run with ``--test-tags leave_approver_benchmark``.
+    """
+
+    EMPLOYEE_COUNT = 2000
+    DEPARTMENT_COUNT = 40
+    LEAVES_PER_EMPLOYEE = 10
+    BATCH_SIZE = 200
+
+
+@tagged('post_install', '-at_install', '-standard', 'leave_approver_benchmark')
+class TestDashboardQueryBudgetAtScale(TestDashboardQueryBudget):
+    EMPLOYEE_COUNT = 2000
+    DEPARTMENT_COUNT = 40
+    LEAVES_PER_EMPLOYEE = 10
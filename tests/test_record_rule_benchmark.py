@@ -0,0 +1,114 @@
+from datetime import date
+import logging
+import statistics
+import time
+
+from odoo.tests import tagged
+
+from .common import LeaveApproverSyntheticOrgCase
+
+_logger = logging.getLogger(__name__)
+
+# rule_hr_leave_user_restricted before it was rewritten on the approver inbox
+OLD_RULE_DOMAIN = """['|','|',
+  ('employee_id.user_id', '=', user.id),
+  ('first_approver_id', '=', user.id),
+  '&', ('second_approver_ids', 'in', [user.id]), ('state', '=', 'validate1')
+]"""
+
+
+class RecordRuleMixin:
+
+    def _get_profiles(self):
+        return {
+            'manager': self.managers[0],
+            'officer': self.officers[0],
+            'employee': self.employees[-1].user_id,
+        }
+
+    def _get_queries(self):
+        return {
+            'list': lambda Leave: Leave.search([], order='create_date desc, id desc').ids,
+            'calendar': lambda Leave: Leave.search([
+                ('request_date_from', '>=', date(2020, 1, 1)),
+                ('request_date_to', '<=', date(2020, 2, 1)),
+            ]).ids,
+            'counter': lambda Leave: Leave.search_count([('state', '=', 'confirm')]),
+        }
+
+    def _run_with_old_rule(self, operation):
+        """Return ``operation()`` run under the rule as it was before the rewrite"""
+        rule = self.env.ref('leave_approver.rule_hr_leave_user_restricted')
+        new_domain = rule.domain_force
+        rule.domain_force = OLD_RULE_DOMAIN
+        try:
+            return operation()
+        finally:
+            rule.domain_force = new_domain
+
+
+@tagged('post_install', '-at_install')
+class TestRecordRule(RecordRuleMixin, LeaveApproverSyntheticOrgCase):
+    """The rewritten rule grants the same visibility as the old one"""
+
+    EMPLOYEE_COUNT = 20
+    DEPARTMENT_COUNT = 2
+    OFFICERS_PER_DEPARTMENT = 2
+
+    def _run_queries(self):
+        results = {}
+        for profile, user in self._get_profiles().items():
+            for query, operation in self._get_queries().items():
+                self.env.invalidate_all()
+                results[profile, query] = operation(self.env['hr.leave'].with_user(user))
+        return results
+
+    def test_same_visibility(self):
+        new_results = self._run_queries()
+        old_results = self._run_with_old_rule(self._run_queries)
+        for key, new_result in new_results.items():
+            self.assertEqual(new_result, old_results[key], "rules must grant the same visibility for %s/%s" % key)
+
+
+@tagged('post_install', '-at_install', '-standard', 'leave_approver_benchmark')
+class TestRecordRuleBenchmark(RecordRuleMixin, LeaveApproverSyntheticOrgCase):
+    """Compare list, calendar and counter latency under the old and new rule.
+
+    Run with ``--test-tags leave_approver_benchmark``; results are logged
+    as one line per user profile and query. Visibility is checked by
+    TestRecordRule.
+    """
+
+    EMPLOYEE_COUNT = 2000
+    DEPARTMENT_COUNT = 40
+    LEAVES_PER_EMPLOYEE = 10
+    REPEAT = 20
+
+    def _median_time(self, user, operation):
+        Leave = self.env['hr.leave'].with_user(user)
+        timings = []
+        for _dummy in range(self.REPEAT):
+            self.env.invalidate_all()
+            start = time.perf_counter()
+            operation(Leave)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings)
+
+    def _measure(self):
+        queries = self._get_queries()
+        # the list view reads one page
+        queries['list'] = lambda Leave: Leave.search([], limit=80, order='create_date desc, id desc').ids
+        return {
+            (profile, query): self._median_time(user, operation)
+            for profile, user in self._get_profiles().items()
+            for query, operation in queries.items()
+        }
+
+    def test_record_rule_benchmark(self):
+        new_times = self._measure()
+        old_times = self._run_with_old_rule(self._measure)
+        for key, new_time in new_times.items():
+            _logger.info(
+                "record rule benchmark %s/%s on %s leaves: old %.2f ms, new %.2f ms",
+                *key, len(self.leaves), old_times[key] * 1000, new_time * 1000,
+            )
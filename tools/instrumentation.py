@@ -0,0 +1,116 @@
+"""Level-gated timing and query counting for the approval hot paths.
+
+Enable with ``--log-handler=odoo.addons.leave_approver.perf:DEBUG``; each
+instrumented stage then emits one JSON line with its duration and SQL
+query count. ``leave_approver.instrumentation_sample_rate`` (0.0 - 1.0,
+default 1.0) limits how many calls are recorded. While the logger is not
+enabled for DEBUG a stage costs a single ``isEnabledFor`` check.
+
+The dashboard routes and approval actions can also be run under Odoo's
+profiler: set ``leave_approver.profiler_enabled`` and list the user ids to
+profile in ``leave_approver.profiler_user_ids`` (comma separated). Each
+profiled call is stored as an ``ir.profile`` record (Settings > Technical >
+Profiling) with Python stack samples, SQL queries and QWeb rendering.
+Switched off, the check reads the cached system parameters only.
+"""
+from contextlib import contextmanager
+import functools
+import json
+import logging
+import random
+import threading
+import time
+
+from odoo.tools import str2bool
+from odoo.tools.profiler import Profiler
+
+_perf_logger = logging.getLogger('odoo.addons.leave_approver.perf')
+
+SAMPLE_RATE_PARAM = 'leave_approver.instrumentation_sample_rate'
+PROFILER_ENABLED_PARAM = 'leave_approver.profiler_enabled'
+PROFILER_USERS_PARAM = 'leave_approver.profiler_user_ids'
+PROFILER_COLLECTORS = ['sql', 'traces_async', 'qweb']
+
+# Marks the thread running a profiled entry point, so nested ones are not
+# profiled a second time
+_profiling = threading.local()
+
+
+def _is_sampled(env):
+    rate = env['ir.config_parameter'].sudo().get_param(SAMPLE_RATE_PARAM, '1.0')
+    try:
+        return random.random() < float(rate)
+    except ValueError:
+        return True
+
+
+@contextmanager
+def approval_stage(env, stage, **tags):
+    """Record the duration and query count of the enclosed block as ``stage``."""
+    if not _perf_logger.isEnabledFor(logging.DEBUG) or not _is_sampled(env):
+        yield
+        return
+
+    start = time.perf_counter()
+    query_count = env.cr.sql_log_count
+    try:
+        yield
+    finally:
+        _perf_logger.debug(json.dumps({
+            'stage': stage,
+            'uid': env.uid,
+            'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+            'queries': env.cr.sql_log_count - query_count,
+            **tags,
+        }, default=str))
+
+
+def instrumented(stage):
+    """Decorate a recordset method to record it as ``stage`` with its record count."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with approval_stage(self.env, stage, model=self._name, records=len(self)):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _is_profiled(env, uid):
+    ICP = env['ir.config_parameter'].sudo()
+    if not str2bool(ICP.get_param(PROFILER_ENABLED_PARAM, 'False')):
+        return False
+    user_ids = ICP.get_param(PROFILER_USERS_PARAM, '')
+    return str(uid) in {user_id.strip() for user_id in user_ids.split(',')}
+
+
+@contextmanager
+def profiling(env, entry_point, uid=None):
+    """Profile the enclosed block into an ``ir.profile`` record if ``uid`` is allowed.
+
+    ``uid`` defaults to the environment user; routes without a session pass
+    the approver of the link.
+    """
+    uid = uid or env.uid
+    if getattr(_profiling, 'active', False) or not _is_profiled(env, uid):
+        yield
+        return
+
+    _profiling.active = True
+    try:
+        with Profiler(db=env.cr.dbname, collectors=PROFILER_COLLECTORS,
+                      description=f"leave_approver {entry_point} (uid {uid})"):
+            yield
+    finally:
+        _profiling.active = False
+
+
+def profiled(entry_point):
+    """Decorate a recordset method to run it under ``profiling``."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with profiling(self.env, entry_point):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator